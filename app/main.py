@@ -914,13 +914,15 @@ async def ble_mode_task(blinky, pm, ser_num):
     
     # Init Bluetooh manager
     ble = ble_manager.BLEManager(device_name=f"Isurlog-{ser_num}", command_callback=process_ble_command)
-    ble_start = time.time()
     
     if (config_manager.dynamic_config["general"].get("debug_led", False)) and (not(config_manager.dynamic_config["digital_config"].get("counter", False))):
         blinky.set_ulp_pattern(pulse_num=5, n_micro_pulses=20, delay_on=5, delay_off=20, inter_delay=200,  wake_up_period=2)
     
-    while (not ble.client_connected) and (time.time() - ble_start < 120):
-        await asyncio.sleep(2)
+    # Wait up to 2 minutes for a client
+    try:
+        await asyncio.wait_for(ble.wait_connected(), 120)
+    except asyncio.TimeoutError:
+        pass
         
     if (config_manager.dynamic_config["general"].get("debug_led", False)) and (not(config_manager.dynamic_config["digital_config"].get("counter", False))):
         blinky.set_ulp_pattern(pulse_num=3, n_micro_pulses=20, delay_on=5, delay_off=20, inter_delay=200,  wake_up_period=2)
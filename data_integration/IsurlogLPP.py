@@ -1,5 +1,16 @@
 import ctypes
-import sys
+import functools
+import logging
+from dataclasses import dataclass
+
+_log = logging.getLogger(__name__)
+
+# Two-digit hex strings for every byte value; indexing this is much cheaper
+# than formatting the channel and size-1 values on every record.
+_HEX1 = [format(i, '02x') for i in range(256)]
+
+# Hex digits emitted per value, by field size
+_HEX_WIDTHS = {1: 2, 2: 4, 4: 8, 6: 4, 9: 6}
 
 sensor_types = {
     'addDigitalInput' : {'type':"00", 'size':1, 'multipl':1, 'signed':False, 'min':0, 'max':255, 'arrLen':3},
@@ -72,77 +83,104 @@ config_types = {
 
 }
 
+@dataclass(slots=True, frozen=True)
+class SensorSpec:
+    """Compact, immutable view of one sensor_types entry."""
+    name: str
+    code: int
+    size: int
+    multipl: int
+    signed: bool
+    lo: float
+    hi: float
+    arr_len: int
+
+# Built once from sensor_types so encode/decode read slot attributes instead
+# of doing string-keyed dict lookups per field.
+_SPECS_BY_NAME = {
+    name: SensorSpec(name, int(info['type'], 16), info['size'], info['multipl'],
+                     info['signed'], info['min'], info['max'], info['arrLen'])
+    for name, info in sensor_types.items()
+}
+_SPECS_BY_CODE = {spec.code: spec for spec in _SPECS_BY_NAME.values()}
+
 def encodeIsurlogLPP(lpp):
     # (Tu función encodeIsurlogLPP original, sin cambios)
-    payload = ""
-    onePayload = ""
+    chunks = []
+    one_chunks = []
 
     for i in range(0,len(lpp)):
-        sensorInfo = sensor_types.get(lpp[i][1])
+        sensorInfo = _SPECS_BY_NAME.get(lpp[i][1])
 
         if sensorInfo == None:
             print("Unknown type " + str(lpp[i][1]) + " in channel " + str(lpp[i][0]) + ".")
             continue
 
-        if len(lpp[i]) != sensorInfo.get("arrLen"):
+        if len(lpp[i]) != sensorInfo.arr_len:
             print("Too few/many values in channel " + str(lpp[i][0]) + " of the type " + str(lpp[i][1]))
+            continue
+
+        channel = lpp[i][0]
+        if not isinstance(channel, int) or channel < 0 or channel > 255:
+            print("The channel number " + repr(channel) + " is in the wrong format!")
+            continue
+        one_chunks.append(_HEX1[channel])    # channel
 
-        else:
-            try:
-                onePayload += str(f'{lpp[i][0]:02x}')    # channel
-            except:
-                print("The channel number is in the wrong format!")
-                continue
-
-            onePayload += sensorInfo.get("type")          # sensor type
-
-            for j in range(2,len(lpp[i])):
-                error = False
-                value = lpp[i][j]
-
-                if type(value) != int and type(value) != float:
-                    print("The value in channel " + str(lpp[i][0]) + " of the type " + lpp[i][1] + " is not a number.")
-                    error = True
-                    break
-
-                if not (value >= sensorInfo.get("min") and value <= sensorInfo.get("max")):
-                    print("Value " + str(value) + " in channel " + str(lpp[i][0]) + " of the type " + lpp[i][1] + " is outside the " + str(sensorInfo.get("min")) + " - " + str(sensorInfo.get("max")) + " range!")
-                    error = True
-                    break
-                valueConversion = int(value * sensorInfo.get("multipl"))
-
-                # Signed conversion
-                sign = False
-
-                if value < 0:
-                    sign = True
-
-                if sensorInfo.get("signed") & sign:
-                    valueConversion = ctypes.c_uint16(valueConversion).value
-
-                # Size
-                if sensorInfo.get("size") == 1:
-                    onePayload += str(f'{valueConversion:02x}')[-2:]
-                elif sensorInfo.get("size") == 2:
-                    onePayload += str(f'{valueConversion:04x}')[-4:]
-                elif sensorInfo.get("size") == 4:
-                    onePayload += str(f'{valueConversion:08x}')[-8:]
-                elif sensorInfo.get("size") == 6:
-                    onePayload += str(f'{valueConversion:04x}')[-4:]
-                elif sensorInfo.get("size") == 9:
-                    onePayload += str(f'{valueConversion:06x}')[-6:]
-
-            if error == False:
-                payload += onePayload
-                onePayload = ""
+        one_chunks.append(_HEX1[sensorInfo.code])          # sensor type
+
+        for j in range(2,len(lpp[i])):
+            error = False
+            value = lpp[i][j]
+
+            if type(value) != int and type(value) != float:
+                print("The value in channel " + str(lpp[i][0]) + " of the type " + lpp[i][1] + " is not a number.")
+                error = True
+                break
+
+            if not (value >= sensorInfo.lo and value <= sensorInfo.hi):
+                print("Value " + str(value) + " in channel " + str(lpp[i][0]) + " of the type " + lpp[i][1] + " is outside the " + str(sensorInfo.lo) + " - " + str(sensorInfo.hi) + " range!")
+                error = True
+                break
+            valueConversion = int(value * sensorInfo.multipl)
+
+            # Signed conversion
+            sign = False
+
+            if value < 0:
+                sign = True
+
+            if sensorInfo.signed & sign:
+                valueConversion = ctypes.c_uint16(valueConversion).value
+
+            # Size -> hex digits per value (sizes 6 and 9 hold three values)
+            width = _HEX_WIDTHS[sensorInfo.size]
+            if width == 2:
+                one_chunks.append(_HEX1[valueConversion & 0xFF])
             else:
-                onePayload = ""
+                one_chunks.append(f'{valueConversion & ((1 << (width * 4)) - 1):0{width}x}')
+
+        if error == False:
+            chunks.extend(one_chunks)
+        one_chunks.clear()
 
-    return payload
+    return "".join(chunks)
 
 
 def decodeIsurlogLPP(payload):
     """Decodes a simplified CayenneLPP payload (IsurlogLPP format)."""
+    # Fresh dicts on every call, so callers may mutate the result without
+    # corrupting the cached records.
+    return [{'channel': channel, 'name': name, 'value': value}
+            for channel, name, value in _decode_cached(payload)]
+
+
+@functools.lru_cache(maxsize=4096)
+def _decode_cached(payload):
+    """
+    Parses a hex payload into an immutable tuple of (channel, name, value)
+    records. Idle devices keep sending identical payloads, so repeats are
+    served from the cache without re-parsing.
+    """
     data = []
     i = 0
     while i < len(payload):
@@ -152,14 +190,9 @@ def decodeIsurlogLPP(payload):
             sensor_type_hex = payload[i:i+2] #Obtiene el tipo
             i += 2
 
-            sensor_type = None #Busca el tipo en base al type
-            for name, info in sensor_types.items():
-                if info['type'] == sensor_type_hex:
-                    sensor_type = name
-                    sensor_info = info
-                    break
+            sensor_info = _SPECS_BY_CODE.get(int(sensor_type_hex, 16)) #Busca el tipo en base al type
 
-            if sensor_type is None:
+            if sensor_info is None:
                 print(f"Unknown sensor type: {sensor_type_hex}")
                 # Opción 1:  Ignorar el dato desconocido y continuar (recomendado)
                 #i += sensor_info['size'] * 2  # Avanzar al siguiente dato (si supiéramos el tamaño)
@@ -168,27 +201,27 @@ def decodeIsurlogLPP(payload):
                 raise ValueError(f"Unknown sensor type: {sensor_type_hex}")
 
 
-            size = sensor_info['size']
+            size = sensor_info.size
             value_hex = payload[i:i + size * 2]
             i += size * 2
 
             # Conversión del valor
             value_int = int(value_hex, 16)
-            if sensor_info['signed']:  #Comprobar si es signed
+            if sensor_info.signed:  #Comprobar si es signed
                 # Convertir a entero con signo (complemento a 2)
                 max_val = 2**(size * 8)
                 if value_int >= max_val // 2:
                     value_int -= max_val
 
-            value = value_int / sensor_info['multipl']
+            value = value_int / sensor_info.multipl
 
-            data.append({'channel': channel, 'name': sensor_type, 'value': value})
-            print(f"Decoded data: {data}", file = sys.stderr)
+            data.append((channel, sensor_info.name, value))
+            _log.debug("Decoded data: %s", data)
         except Exception as e:
-            print(f"Error decoding payload at index {i}: {e}", file = sys.stderr)
+            _log.debug("Error decoding payload at index %d: %s", i, e)
             # Considerar si quieres continuar o detenerte aquí.  Si continúas,
             # podrías perder datos.  Es mejor detenerse si el formato es crítico.
             break #Detener
 
-    return data
+    return tuple(data)
 
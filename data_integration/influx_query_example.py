@@ -1,3 +1,4 @@
+import atexit
 import influxdb_client
 from datetime import datetime
 
@@ -8,6 +9,12 @@ ORG = "isurki"
 TOKEN = "YOUR_UNIQUE_API_TOKEN_HERE" # Replace with the client's private token
 BUCKET = "YOUR_UNIQUE_BUCKET_HERE" # Replace with the client's dedicated bucket name
 
+# One client (and its HTTP connection pool) is shared by every query, so the
+# TCP/TLS handshake and token auth are only paid once per process.
+_client = influxdb_client.InfluxDBClient(url=URL, token=TOKEN, org=ORG, enable_gzip=True)
+_query_api = _client.query_api()
+atexit.register(_client.close)
+
 def get_isurlog_readings(device_id: str, days_range: int = 7) -> list:
     """
     Connects to InfluxDB and queries ALL recorded values within a specified range
@@ -21,50 +28,45 @@ def get_isurlog_readings(device_id: str, days_range: int = 7) -> list:
         A list of dictionaries, where each dictionary represents one reading record,
         or an empty list if no data is found or an error occurs.
     """
+
+    # Flux query to get ALL values within the range for a device
+    # We query for ALL fields that exist in the measurement (by removing the field filter)
+    query = f'''
+    from(bucket: "{BUCKET}")
+      |> range(start: -{days_range}d)
+      |> filter(fn: (r) => r["isurlog_id"] == "{device_id}")
+    '''
     
-    # It is recommended to create one client instance and reuse it.
-    with influxdb_client.InfluxDBClient(url=URL, token=TOKEN, org=ORG) as client:
-        query_api = client.query_api()
-
-        # Flux query to get ALL values within the range for a device
-        # We query for ALL fields that exist in the measurement (by removing the field filter)
-        query = f'''
-        from(bucket: "{BUCKET}")
-          |> range(start: -{days_range}d)
-          |> filter(fn: (r) => r["isurlog_id"] == "{device_id}")
-        '''
-        
-        all_records = []
-        
-        try:
-            tables = query_api.query(query, org=ORG)
+    all_records = []
+    
+    try:
+        # Temporary dictionary to group measurements by timestamp (using the datetime object)
+        grouped_readings = {}
+
+        # query_stream() yields records lazily instead of materializing every
+        # table in memory first, so long ranges do not blow up the heap.
+        for record in _query_api.query_stream(query, org=ORG):
+            # The record.get_time() returns a native Python datetime object
+            time_dt = record.get_time() 
+            field = record.get_field()
+            value = record.get_value()
+            
+            # Use the raw datetime object as the key for grouping
+            if time_dt not in grouped_readings:
+                # Store the datetime object directly
+                grouped_readings[time_dt] = {"Time": time_dt} 
             
-            # Temporary dictionary to group measurements by timestamp (using the datetime object)
-            grouped_readings = {}
-
-            for table in tables:
-                for record in table.records:
-                    # The record.get_time() returns a native Python datetime object
-                    time_dt = record.get_time() 
-                    field = record.get_field()
-                    value = record.get_value()
-                    
-                    # Use the raw datetime object as the key for grouping
-                    if time_dt not in grouped_readings:
-                        # Store the datetime object directly
-                        grouped_readings[time_dt] = {"Time": time_dt} 
-                    
-                    grouped_readings[time_dt][field] = value
-
-            # Convert dictionary into a sorted list of records
-            for time in sorted(grouped_readings.keys()):
-                all_records.append(grouped_readings[time])
-                
-        except Exception as e:
-            print(f"An error occurred while querying InfluxDB: {e}")
-            return []
+            grouped_readings[time_dt][field] = value
+
+        # Convert dictionary into a sorted list of records
+        for time in sorted(grouped_readings.keys()):
+            all_records.append(grouped_readings[time])
             
-        return all_records
+    except Exception as e:
+        print(f"An error occurred while querying InfluxDB: {e}")
+        return []
+        
+    return all_records
 
 def print_data_as_table(data: list):
     """Imprime los datos recuperados en un formato tabular limpio."""
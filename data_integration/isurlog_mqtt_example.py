@@ -1,6 +1,8 @@
 import paho.mqtt.client as mqtt
-import json
+import orjson
 import base64
+import queue
+import ssl
 import IsurlogLPP 
 
 # --- Connection Parameters ---
@@ -12,6 +14,15 @@ PASSWORD = "YOUR_UNIQUE_PASSWORD_HERE"
 TOPIC_NB_IOT = "dataloggers/datos/+"
 APLICATION_ID = "YOUR_APPLICATION_ID_HERE"
 TOPIC_LORAWAN = f"application/+/device/+/event/up"
+LORAWAN_TOPIC_PREFIX = "application/"
+
+# Built once and reused on every (re)connect instead of letting tls_set()
+# create a new default context and reload the CA bundle each time.
+_TLS_CTX = ssl.create_default_context()
+
+# Received (topic, payload) pairs, filled by paho's network thread and
+# drained by process_messages() in the main thread.
+_messages = queue.Queue()
 
 # --- MQTT Callback Functions ---
 
@@ -26,56 +37,75 @@ def on_connect(client, userdata, flags, rc):
     else:
         print(f"Failed to connect, return code {rc}\n")
 
-def on_message(client, userdata, msg):
-    """Callback function for when a message is received."""
-    print(f"\n--- Message received on topic: {msg.topic} ---")
-    
-    # Check if the message is from a LoRaWAN device via ChirpStack
-    if msg.topic.startswith("application/"):
-        try:
-            # 1. Decode the main JSON payload from ChirpStack
-            chirpstack_data = json.loads(msg.payload.decode('utf-8'))
-            print(chirpstack_data)
-            device_name = chirpstack_data.get('deviceInfo', {}).get('deviceName', 'unknown')
-            
-            # 2. Extract the already decoded 'object'
-            decoded_object = chirpstack_data.get('object')
-            
-            print(f"LoRaWAN device Name: {device_name}")
-            if decoded_object:
-                print(f"Decoded data (from ChirpStack 'object'): {decoded_object}")
-                # You can also access other useful info, e.g., RSSI
-                rssi = chirpstack_data.get('rxInfo', [{}])[0].get('rssi', 'N/A')
-                print(f"Network Info: RSSI = {rssi}")
-            else:
-                print("Message contains no decoded 'object'.")
-
-        except Exception as e:
-            print(f"An error occurred processing LoRaWAN message: {e}")
-
-    # Otherwise, assume it's a direct payload from an NB-IoT device
-    else:
-        try:
-            device_id = msg.topic.split('/')[-1]
-            # The payload is already the hex string
-            hex_payload = msg.payload.decode()
+def _handle_lorawan(topic, payload):
+    """Handles an uplink forwarded by ChirpStack (LoRaWAN devices)."""
+    try:
+        # 1. Decode the main JSON payload from ChirpStack (orjson parses bytes directly)
+        chirpstack_data = orjson.loads(payload)
+        print(chirpstack_data)
+        device_name = chirpstack_data.get('deviceInfo', {}).get('deviceName', 'unknown')
+        
+        # 2. Extract the already decoded 'object'
+        decoded_object = chirpstack_data.get('object')
+        
+        print(f"LoRaWAN device Name: {device_name}")
+        if decoded_object:
+            print(f"Decoded data (from ChirpStack 'object'): {decoded_object}")
+            # You can also access other useful info, e.g., RSSI
+            rssi = chirpstack_data.get('rxInfo', [{}])[0].get('rssi', 'N/A')
+            print(f"Network Info: RSSI = {rssi}")
+        else:
+            print("Message contains no decoded 'object'.")
 
-            print(f"NB-IoT device ID: {device_id}")
-            print(f"Raw payload (hex): {hex_payload}")
+    except Exception as e:
+        print(f"An error occurred processing LoRaWAN message: {e}")
 
-            # Use your IsurlogLPP library to decode the hex payload
-            decoded_data = IsurlogLPP.decodeIsurlogLPP(hex_payload)
-            print(f"Decoded data: {decoded_data}")
+def _handle_nbiot(topic, payload):
+    """Handles a direct hex payload published by an NB-IoT device."""
+    try:
+        device_id = topic.rpartition('/')[2]
+        # The payload is already the hex string
+        hex_payload = payload.decode()
 
-        except Exception as e:
-            print(f"An error occurred processing NB-IoT message: {e}")
+        print(f"NB-IoT device ID: {device_id}")
+        print(f"Raw payload (hex): {hex_payload}")
+
+        # Use your IsurlogLPP library to decode the hex payload
+        decoded_data = IsurlogLPP.decodeIsurlogLPP(hex_payload)
+        print(f"Decoded data: {decoded_data}")
+
+    except Exception as e:
+        print(f"An error occurred processing NB-IoT message: {e}")
+
+# Topic root (first path segment) -> handler. Adding a new device family only
+# needs a new entry here.
+_DISPATCH = {
+    LORAWAN_TOPIC_PREFIX.rstrip('/'): _handle_lorawan,
+    TOPIC_NB_IOT.partition('/')[0]: _handle_nbiot,
+}
+
+def on_message(client, userdata, msg):
+    """Callback function for when a message is received."""
+    # Runs on paho's network thread: only hand the message over, so decoding
+    # (and any downstream database writes) never stalls reception.
+    _messages.put((msg.topic, msg.payload))
+
+def process_messages():
+    """Decodes queued messages with the handler registered for their topic."""
+    while True:
+        topic, payload = _messages.get()
+        print(f"\n--- Message received on topic: {topic} ---")
+        
+        # Anything that is not a known root is assumed to be a direct payload from an NB-IoT device
+        handler = _DISPATCH.get(topic.partition('/')[0], _handle_nbiot)
+        handler(topic, payload)
 
 # --- Main Execution ---
 
 if __name__ == "__main__":
     client = mqtt.Client()
     client.username_pw_set(USERNAME, PASSWORD)
-    client.tls_set()
+    client.tls_set_context(_TLS_CTX)
     
     client.on_connect = on_connect
     client.on_message = on_message
@@ -83,6 +113,13 @@ if __name__ == "__main__":
     try:
         print(f"Connecting to broker at {BROKER_URL}...")
         client.connect(BROKER_URL, BROKER_PORT, 60)
-        client.loop_forever()
     except Exception as e:
-        print(f"Could not connect to broker: {e}")
\ No newline at end of file
+        print(f"Could not connect to broker: {e}")
+    else:
+        # Network I/O runs on paho's own thread; this one consumes the queue.
+        client.loop_start()
+        try:
+            process_messages()
+        finally:
+            client.loop_stop()
+            client.disconnect()
@@ -0,0 +1,248 @@
+// Copyright (C) 2026 ISURKI
+//
+// This program is free software: you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation, either version 3 of the License, or
+// (at your option) any later version.
+//
+// SPDX-License-Identifier: GPL-3.0-or-later
+
+// Native encoder/decoder for the Isurlog LPP payload format.
+//
+// This module is the fast path of lib/IsurlogLPP.py and is not meant to be
+// used directly. The type tables stay in Python (the single source of truth)
+// and are passed in already flattened to tuples:
+//
+//   sensor table: {name: (type_byte, value_width, signed, multipl, min, max, arrLen)}
+//   config table: {type_byte: (name, size, signed, multipl)}
+//
+// Both functions return None as soon as they find anything they do not
+// handle (unknown type, wrong value count, out of range value, malformed
+// hex, truncated payload...). The caller then runs the Python
+// implementation, which produces the same result plus the error logs.
+
+#include <string.h>
+
+#include "py/runtime.h"
+#include "py/objint.h"
+#include "py/unicode.h"
+
+static const char isurlog_lpp_hex_digits[] = "0123456789abcdef";
+
+static int isurlog_lpp_hex_nibble(byte c) {
+    if (c >= '0' && c <= '9') {
+        return c - '0';
+    }
+    c |= 0x20; // lower case
+    if (c >= 'a' && c <= 'f') {
+        return c - 'a' + 10;
+    }
+    return -1;
+}
+
+static mp_obj_t isurlog_lpp_lookup(mp_obj_t dict, mp_obj_t key) {
+    mp_map_elem_t *elem = mp_map_lookup(mp_obj_dict_get_map(dict), key, MP_MAP_LOOKUP);
+    return elem == NULL ? MP_OBJ_NULL : elem->value;
+}
+
+static bool isurlog_lpp_is_number(mp_obj_t value) {
+    // Same check as the Python path: isinstance(value, (int, float)), which
+    // MicroPython does not satisfy for bool
+    #if MICROPY_PY_BUILTINS_FLOAT
+    if (mp_obj_is_float(value)) {
+        return true;
+    }
+    #endif
+    return mp_obj_is_int(value);
+}
+
+// encode(lpp, sensor_table) -> str or None
+static mp_obj_t isurlog_lpp_encode(mp_obj_t lpp_in, mp_obj_t table_in) {
+    size_t n_rows;
+    mp_obj_t *rows;
+    mp_obj_get_array(lpp_in, &n_rows, &rows);
+
+    vstr_t vstr;
+    vstr_init(&vstr, n_rows * 8);
+
+    for (size_t r = 0; r < n_rows; r++) {
+        size_t row_len;
+        mp_obj_t *row;
+        mp_obj_get_array(rows[r], &row_len, &row);
+        if (row_len < 2 || !mp_obj_is_str(row[1])) {
+            goto fallback;
+        }
+
+        mp_obj_t info_in = isurlog_lpp_lookup(table_in, row[1]);
+        if (info_in == MP_OBJ_NULL) {
+            goto fallback;
+        }
+        mp_obj_t *info;
+        mp_obj_get_array_fixed_n(info_in, 7, &info);
+        mp_int_t type_byte = MP_OBJ_SMALL_INT_VALUE(info[0]);
+        size_t width = MP_OBJ_SMALL_INT_VALUE(info[1]);
+        mp_obj_t mult = info[3];
+        mp_obj_t lo = info[4];
+        mp_obj_t hi = info[5];
+        if (row_len != (size_t)MP_OBJ_SMALL_INT_VALUE(info[6])) {
+            goto fallback;
+        }
+
+        if (!mp_obj_is_small_int(row[0])) {
+            goto fallback;
+        }
+        mp_int_t channel = MP_OBJ_SMALL_INT_VALUE(row[0]);
+        if (channel & ~0xFF) {
+            goto fallback;
+        }
+
+        byte frame[2 + 3 * 4];
+        size_t len = 0;
+        frame[len++] = channel;
+        frame[len++] = type_byte;
+
+        for (size_t v = 2; v < row_len; v++) {
+            mp_obj_t value = row[v];
+            if (!isurlog_lpp_is_number(value)
+                || mp_binary_op(MP_BINARY_OP_LESS_EQUAL, lo, value) != mp_const_true
+                || mp_binary_op(MP_BINARY_OP_LESS_EQUAL, value, hi) != mp_const_true) {
+                goto fallback;
+            }
+            mp_obj_t scaled = mp_binary_op(MP_BINARY_OP_MULTIPLY, value, mult);
+            #if MICROPY_PY_BUILTINS_FLOAT
+            if (mp_obj_is_float(scaled)) {
+                scaled = mp_obj_new_int_from_float(mp_obj_get_float(scaled));
+            }
+            #endif
+            // Values are at most 4 bytes wide, so the low bits of the
+            // truncated integer are its two's complement encoding
+            mp_uint_t raw = (mp_uint_t)mp_obj_int_get_truncated(scaled);
+            for (size_t b = width; b-- > 0;) {
+                frame[len + b] = raw & 0xFF;
+                raw >>= 8;
+            }
+            len += width;
+        }
+
+        // The record is only committed once all its values are valid
+        char *out = vstr_add_len(&vstr, len * 2);
+        for (size_t b = 0; b < len; b++) {
+            *out++ = isurlog_lpp_hex_digits[frame[b] >> 4];
+            *out++ = isurlog_lpp_hex_digits[frame[b] & 0xF];
+        }
+    }
+
+    return mp_obj_new_str_from_vstr(&vstr);
+
+fallback:
+    vstr_clear(&vstr);
+    return mp_const_none;
+}
+static MP_DEFINE_CONST_FUN_OBJ_2(isurlog_lpp_encode_obj, isurlog_lpp_encode);
+
+// decode(hex_payload, config_table) -> list or None
+static mp_obj_t isurlog_lpp_decode(mp_obj_t payload_in, mp_obj_t table_in) {
+    size_t hex_len;
+    const byte *hex = (const byte *)mp_obj_str_get_data(payload_in, &hex_len);
+    if (hex_len & 1) {
+        return mp_const_none;
+    }
+
+    size_t n = hex_len / 2;
+    byte *buf = m_new(byte, n);
+    for (size_t i = 0; i < n; i++) {
+        int hi = isurlog_lpp_hex_nibble(hex[2 * i]);
+        int lo = isurlog_lpp_hex_nibble(hex[2 * i + 1]);
+        if (hi < 0 || lo < 0) {
+            goto fallback;
+        }
+        buf[i] = (hi << 4) | lo;
+    }
+
+    mp_obj_t data = mp_obj_new_list(0, NULL);
+    size_t i = 0;
+    while (i < n) {
+        if (i + 2 > n) {
+            goto fallback;
+        }
+        mp_int_t channel = buf[i];
+        mp_obj_t info_in = isurlog_lpp_lookup(table_in, MP_OBJ_NEW_SMALL_INT(buf[i + 1]));
+        i += 2;
+        if (info_in == MP_OBJ_NULL) {
+            goto fallback;
+        }
+        mp_obj_t *info;
+        mp_obj_get_array_fixed_n(info_in, 4, &info);
+        size_t size = MP_OBJ_SMALL_INT_VALUE(info[1]);
+        bool is_signed = mp_obj_is_true(info[2]);
+        mp_obj_t value;
+
+        if (size == 0) {
+            // Strings: length byte followed by the text
+            if (i + 1 > n || i + 1 + buf[i] > n) {
+                goto fallback;
+            }
+            size_t str_len = buf[i++];
+            // Only ASCII text is built here: the Python decoder maps every
+            // byte to one character, which UTF-8 would not do for the rest
+            for (size_t b = 0; b < str_len; b++) {
+                if (buf[i + b] & 0x80) {
+                    goto fallback;
+                }
+            }
+            value = mp_obj_new_str((const char *)buf + i, str_len);
+            i += str_len;
+        } else {
+            if (i + size > n) {
+                goto fallback;
+            }
+            if (size <= 4) {
+                mp_uint_t raw = 0;
+                for (size_t b = 0; b < size; b++) {
+                    raw = (raw << 8) | buf[i + b];
+                }
+                if (is_signed && size < sizeof(mp_uint_t) && (raw >> (size * 8 - 1))) {
+                    raw |= ~(mp_uint_t)0 << (size * 8); // sign extend
+                }
+                value = is_signed ? mp_obj_new_int((mp_int_t)raw) : mp_obj_new_int_from_uint(raw);
+            } else if (!is_signed) {
+                // 8 and 16-byte keys
+                value = mp_obj_int_from_bytes_impl(true, size, buf + i);
+            } else {
+                goto fallback;
+            }
+            i += size;
+            if (info[3] != MP_OBJ_NEW_SMALL_INT(1)) {
+                value = mp_binary_op(MP_BINARY_OP_TRUE_DIVIDE, value, info[3]);
+            }
+        }
+
+        mp_obj_t entry = mp_obj_new_dict(3);
+        mp_obj_dict_store(entry, MP_OBJ_NEW_QSTR(MP_QSTR_channel), MP_OBJ_NEW_SMALL_INT(channel));
+        mp_obj_dict_store(entry, MP_OBJ_NEW_QSTR(MP_QSTR_name), info[0]);
+        mp_obj_dict_store(entry, MP_OBJ_NEW_QSTR(MP_QSTR_value), value);
+        mp_obj_list_append(data, entry);
+    }
+
+    m_del(byte, buf, n);
+    return data;
+
+fallback:
+    m_del(byte, buf, n);
+    return mp_const_none;
+}
+static MP_DEFINE_CONST_FUN_OBJ_2(isurlog_lpp_decode_obj, isurlog_lpp_decode);
+
+static const mp_rom_map_elem_t isurlog_lpp_module_globals_table[] = {
+    { MP_ROM_QSTR(MP_QSTR___name__), MP_ROM_QSTR(MP_QSTR__isurlog_lpp) },
+    { MP_ROM_QSTR(MP_QSTR_encode), MP_ROM_PTR(&isurlog_lpp_encode_obj) },
+    { MP_ROM_QSTR(MP_QSTR_decode), MP_ROM_PTR(&isurlog_lpp_decode_obj) },
+};
+static MP_DEFINE_CONST_DICT(isurlog_lpp_module_globals, isurlog_lpp_module_globals_table);
+
+const mp_obj_module_t isurlog_lpp_user_cmodule = {
+    .base = { &mp_type_module },
+    .globals = (mp_obj_dict_t *)&isurlog_lpp_module_globals,
+};
+
+MP_REGISTER_MODULE(MP_QSTR__isurlog_lpp, isurlog_lpp_user_cmodule);
@@ -0,0 +1,15 @@
+# Create an INTERFACE library for the Isurlog LPP C module.
+add_library(usermod_isurlog_lpp INTERFACE)
+
+# Add our source files to the lib
+target_sources(usermod_isurlog_lpp INTERFACE
+    ${CMAKE_CURRENT_LIST_DIR}/isurlog_lpp.c
+)
+
+# Add the current directory as an include directory.
+target_include_directories(usermod_isurlog_lpp INTERFACE
+    ${CMAKE_CURRENT_LIST_DIR}
+)
+
+# Link our INTERFACE library to the usermod target.
+target_link_libraries(usermod INTERFACE usermod_isurlog_lpp)
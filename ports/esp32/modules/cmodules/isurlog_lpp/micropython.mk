@@ -0,0 +1,6 @@
+ISURLOG_LPP_MOD_DIR := $(USERMOD_DIR)
+
+# Add all C files to SRC_USERMOD.
+SRC_USERMOD += $(ISURLOG_LPP_MOD_DIR)/isurlog_lpp.c
+
+CFLAGS_USERMOD += -I$(ISURLOG_LPP_MOD_DIR)
@@ -0,0 +1,6 @@
+# Isurlog user C modules, built into the firmware through USER_C_MODULES
+# (see ports/esp32/Makefile). Paths are absolute, and ${CMAKE_CURRENT_LIST_DIR}
+# can be used to prefix subdirectories.
+
+# Native fast path of lib/IsurlogLPP.py
+include(${CMAKE_CURRENT_LIST_DIR}/isurlog_lpp/micropython.cmake)
@@ -7,190 +7,313 @@
 #
 # SPDX-License-Identifier: GPL-3.0-or-later
 
+import micropython
+import struct
+import ubinascii
+from micropython import const
 from modules import utils
 
+try:
+    # Native encoder/decoder (cmodules/isurlog_lpp), built into the firmware
+    # through USER_C_MODULES. Without it the Python implementation is used.
+    import _isurlog_lpp
+except ImportError:
+    _isurlog_lpp = None
+
+# Numeric hot paths of encode()/decode(), compiled to machine code by the
+# native emitter. Dict access stays in the (bytecode) callers.
+def _make_encoder(pack_fmt, mult, lo, hi):
+    # Encoder for one value of a given sensor type, with its constants bound:
+    # returns the packed bytes, or None when the value is out of range
+    pack = struct.pack
+    if pack_fmt is None:
+        # 3-byte values (GPS) have no struct format; masking to the value
+        # width yields the two's complement of negatives
+        @micropython.native
+        def encode_value(value):
+            if not (lo <= value <= hi):
+                return None
+            return pack('>I', int(value * mult) & 0xFFFFFF)[1:]
+    else:
+        # Signed formats do the two's complement conversion
+        @micropython.native
+        def encode_value(value):
+            if not (lo <= value <= hi):
+                return None
+            return pack(pack_fmt, int(value * mult))
+    return encode_value
+
+@micropython.viper
+def _encode_u8(buf: ptr8, off: int, channel: int, type_byte: int, value: int) -> int:
+    # Whole record of a 1-byte unsigned type with no scaling (digital inputs,
+    # flags, addresses...) written straight into the payload buffer
+    buf[off] = channel
+    buf[off + 1] = type_byte
+    buf[off + 2] = value
+    return off + 3
+
+_HEX_DIGITS = '0123456789abcdefABCDEF'
+
+def _unhexlify_prefix(payload):
+    # Bytes of the longest valid, even-length hex prefix of the payload, so a
+    # corrupt or odd-length tail only loses the records it reaches into
+    try:
+        return ubinascii.unhexlify(payload)
+    except ValueError:
+        pass
+    end = len(payload) & ~1
+    for k in range(end):
+        if payload[k] not in _HEX_DIGITS:
+            end = k & ~1
+            break
+    return ubinascii.unhexlify(payload[:end])
+
+def _bytes_to_str(b):
+    # One character per byte, as strings have always been decoded (UTF-8
+    # sequences are not combined). ASCII, the usual case, takes one str() call
+    for c in b:
+        if c > 0x7F:
+            return ''.join([chr(c) for c in b])
+    return str(b, 'utf-8')
+
+@micropython.native
+def _decode_value(value_int, mult):
+    # Scales a raw integer back to engineering units
+    if mult != 1:
+        return value_int / mult
+    return value_int
+
+#Sensor types
+_SENSOR_TYPES = {
+    'addDigitalInput' : {'type':"00", 'size':1, 'multipl':1, 'signed':False, 'min':0, 'max':255, 'arrLen':3},
+    'addDigitalOutput' : {'type':"01", 'size':1, 'multipl':1, 'signed':False, 'min':0, 'max':255, 'arrLen':3},
+    'addAnalogInput' : {'type':"02", 'size':2, 'multipl':100, 'signed':True, 'min':-327.67, 'max':327.67, 'arrLen':3},
+    'addAnalogOutput' : {'type':"03", 'size':2, 'multipl':100, 'signed':True, 'min':-327.67, 'max':327.67, 'arrLen':3},
+    'addModbusInput' : {'type':"04", 'size':2, 'multipl':100, 'signed':True, 'min':-327.67, 'max':327.67, 'arrLen':3},
+    'addModbusGenericInput' : {'type':"05", 'size':2, 'multipl':1, 'signed':False, 'min':0, 'max':65534, 'arrLen':3},
+    'addTemperatureInput' : {'type':"66", 'size':2, 'multipl':10, 'signed':True, 'min':-3276.7, 'max':3276.7, 'arrLen':3},
+    'addTemperatureSensor' : {'type':"67", 'size':2, 'multipl':10, 'signed':True, 'min':-3276.7, 'max':3276.7, 'arrLen':3},
+    'addHumiditySensor' : {'type':"68", 'size':1, 'multipl':2, 'signed':False, 'min':0, 'max':100, 'arrLen':3},
+    'addAccelerometer' : {'type':"71", 'size':6, 'multipl':1000, 'signed':True, 'min':-32.768, 'max':32.767, 'arrLen':5},
+    'addVoltageInput' : {'type':"74", 'size':2, 'multipl':1, 'signed':False, 'min':0, 'max':65534, 'arrLen':3},
+    'addUnixTime' : {'type':"75", 'size':4, 'multipl':1, 'signed':False, 'min':0, 'max':4294967295, 'arrLen':3},
+    'addSoCInput'   : {'type':"76", 'size':2, 'multipl':10, 'signed':False, 'min':0, 'max':100.0, 'arrLen':3},
+    'addCRateInput' : {'type':"77", 'size':1, 'multipl':10, 'signed':True, 'min':-12.8, 'max':12.7, 'arrLen':3},
+    'addModemData' : {'type':"78", 'size':1, 'multipl':1, 'signed':False, 'min':0, 'max':255, 'arrLen':3},
+    'addScriptError' : {'type':"79", 'size':1, 'multipl':1, 'signed':False, 'min':0, 'max':1, 'arrLen':3},
+    'addGPSData': {'type':"88", 'size':9, 'multipl':10000, 'signed':True, 'min':-900000, 'max':900000, 'arrLen':5},
+}
+#Configuration types
+_CONFIG_TYPES = {
+    'setLatencyTime':               {'type': "A0", 'size': 1, 'multipl': 1, 'signed': False, 'min': 1, 'max': 255},
+    'setRtcSync':                 {'type': "A1", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setRegisterMode':            {'type': "A2", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setRegisterAccumulator':     {'type': "A3", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
+    'setMagnetWakeup':            {'type': "A4", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setDebugLED':                {'type': "A5", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setLoRaWANDevEUI':           {'type': "A6", 'size': 8, 'multipl': 1, 'signed': False, 'min': 0, 'max': 0xFFFFFFFFFFFFFFFF},
+    'setLoRaWANAppEUI':           {'type': "A7", 'size': 8, 'multipl': 1, 'signed': False, 'min': 0, 'max': 0xFFFFFFFFFFFFFFFF},
+    'setLoRaWANAppKey':           {'type': "A8", 'size': 16, 'multipl': 1, 'signed': False, 'min': 0, 'max': 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF},
+    'setNB_IoTeDRX':              {'type': "A9", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setAnalogPreAcquisition':    {'type': "AA", 'size': 2, 'multipl': 1, 'signed': False, 'min': 0, 'max': 65535},
+    'setAnalogInputEnable':       {'type': "AB", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setAnalogInputZero':         {'type': "AC", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setAnalogInputFullScale':    {'type': "AD", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setAnalogInputLow':          {'type': "AE", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setAnalogInputHigh':         {'type': "AF", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setAnalogInputLowCond':      {'type': "B0", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setAnalogInputHighCond':     {'type': "B1", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setDigitalEnable':           {'type': "B2", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setDigitalCounter':          {'type': "B3", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setDigitalPulseWeight':      {'type': "B4", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
+    'setDigitalWake':             {'type': "B5", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
+    'setDigitalLow':              {'type': "B6", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
+    'setDigitalHigh':             {'type': "B7", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
+    'setDigitalLowCond':          {'type': "B8", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setDigitalHighCond':         {'type': "B9", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setModbusPreAcquisition':    {'type': "BA", 'size': 2, 'multipl': 1, 'signed': False, 'min': 0, 'max': 65535},
+    'setModbusInputEnable':       {'type': "BB", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setModbusInputSlaveAddress': {'type': "BC", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
+    'setModbusInputRegisterAddress':{'type': "BD", 'size': 2, 'multipl': 1, 'signed': False, 'min': 0, 'max': 65535},
+    'setModbusInputFc':           {'type': "BE", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
+    'setModbusInputNumberOfDecimals':{'type': "BF", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
+    'setModbusInputIsFP':         {'type': "C0", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setModbusInputInvert':       {'type': "C1", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setModbusInputOffset':       {'type': "C2", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setModbusInputLow':          {'type': "C3", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setModbusInputHigh':         {'type': "C4", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setModbusInputLowCond':      {'type': "C5", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setModbusInputHighCond':     {'type': "C6", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setPT100Enable':             {'type': "C7", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setPT100Wires':              {'type': "C8", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1}, # Debería ser min:2, max:4 ? Revisar definición
+    'setPT100Low':                {'type': "C9", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setPT100High':               {'type': "CA", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setPT100LowCond':            {'type': "CB", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setPT100HighCond':           {'type': "CC", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setINTTHEnable':            {'type': "CD", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setINTTHTemperatureLow':    {'type': "CE", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setINTTHTemperatureHigh':   {'type': "CF", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setINTTHTemperatureLowCond':{'type': "D0", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setINTTHTemperatureHighCond':{'type': "D1", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setINTTHHumidityLow':       {'type': "D2", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67}, # Originalmente size:1 multipl:2? Revisar
+    'setINTTHHumidityHigh':      {'type': "D3", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},# Originalmente size:1 multipl:2? Revisar
+    'setINTTHHumidityLowCond':   {'type': "D4", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setINTTHHumidityHighCond':  {'type': "D5", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    # ----------------- Isurnode Config Types -----------------
+    # -- Isurnode General --
+    'setIsurnodeEnable': {'type': "D6", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setIsurnodeSlaveAddress': {'type': "D7", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
+
+    # -- Isurnode Analog Config --
+    'setIsurnodeAnalogPreAcquisition': {'type': "D8", 'size': 2, 'multipl': 1, 'signed': False, 'min': 0, 'max': 65535},
+    'setIsurnodeAnalogTriggerAddress': {'type': "D9", 'size': 2, 'multipl': 1, 'signed': False, 'min': 0, 'max': 65535},
+    'setIsurnodeAnalogInputEnable': {'type': "DA", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setIsurnodeAnalogInputZero': {'type': "DB", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setIsurnodeAnalogInputFullScale': {'type': "DC", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setIsurnodeAnalogInputLow': {'type': "DD", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setIsurnodeAnalogInputHigh': {'type': "DE", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setIsurnodeAnalogInputLowCond': {'type': "DF", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setIsurnodeAnalogInputHighCond': {'type': "E0", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setIsurnodeAnalogInputAddress': {'type': "E1", 'size': 2, 'multipl': 1, 'signed': False, 'min': 0, 'max': 65535},
+
+    # -- Isurnode SHT30 Sensor --
+    'setIsurnodeSHT30Enable': {'type': "E2", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setIsurnodeSHT30TriggerAddress': {'type': "E3", 'size': 2, 'multipl': 1, 'signed': False, 'min': 0, 'max': 65535},
+    'setIsurnodeSHT30Address': {'type': "E4", 'size': 2, 'multipl': 1, 'signed': False, 'min': 0, 'max': 65535},
+    'setIsurnodeSHT30TempLow': {'type': "E5", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setIsurnodeSHT30TempHigh': {'type': "E6", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setIsurnodeSHT30TempLowCond': {'type': "E7", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setIsurnodeSHT30TempHighCond': {'type': "E8", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setIsurnodeSHT30HumLow': {'type': "E9", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setIsurnodeSHT30HumHigh': {'type': "EA", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setIsurnodeSHT30HumLowCond': {'type': "EB", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setIsurnodeSHT30HumHighCond': {'type': "EC", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+
+    # -- Isurnode Digital Outputs --
+    'setIsurnodeDigitalOutputEnable': {'type': "ED", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setIsurnodeDigitalOutputType': {'type': "EE", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
+    'setIsurnodeDigitalOutputLogicOp': {'type': "EF", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 2},
+    'setIsurnodeDigitalOutputOnTime': {'type': "FC", 'size': 2, 'multipl': 1, 'signed': False, 'min': 0, 'max': 65535},
+    
+    # (First output condition)
+    'setIsurnodeDigitalOutputCond1Enable': {'type': "F0", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setIsurnodeDigOutCond1Sensor': {'type': "F1", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
+    'setIsurnodeDigOutCond1Low': {'type': "F2", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setIsurnodeDigOutCond1High': {'type': "F3", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setIsurnodeDigOutCond1LowCond': {'type': "F4", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setIsurnodeDigOutCond1HighCond': {'type': "F5", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    
+    # (Second output condition)
+    'setIsurnodeDigitalOutputCond2Enable': {'type': "F6", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setIsurnodeDigOutCond2Sensor': {'type': "F7", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
+    'setIsurnodeDigOutCond2Low': {'type': "F8", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setIsurnodeDigOutCond2High': {'type': "F9", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setIsurnodeDigOutCond2LowCond': {'type': "FA", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setIsurnodeDigOutCond2HighCond': {'type': "FB", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+
+    'setModbusInputLongInt': {'type': "FE", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    #New additions for more flexible modbus inputs 06-11-2025
+    'setModbusInputBaudrate': {'type': "FF", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 4},
+    'setModbusInputDataBits': {'type': "80", 'size': 1, 'multipl': 1, 'signed': False, 'min': 7, 'max': 8},
+    'setModbusInputStopBits': {'type': "81", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 2},
+    'setModbusInputParity': {'type': "82", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 2},
+    #New addition to enable continious mode and configure number of loops per reading cycle 11-11-2025
+    'setContinuousMode': {'type': "83", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setLoopCycles': {'type': "84", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
+    #New addittion to enable external temperature and humidity sensors (BME280/BMP280/BME680)
+    'setEXTTHEnable':            {'type': "85", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setEXTTHTemperatureLow':    {'type': "86", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setEXTTHTemperatureHigh':   {'type': "87", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setEXTTHTemperatureLowCond':{'type': "88", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setEXTTHTemperatureHighCond':{'type': "89", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setEXTTHHumidityLow':       {'type': "8A", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67}, # Originalmente size:1 multipl:2? Revisar
+    'setEXTTHHumidityHigh':      {'type': "8B", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67}, # Originalmente size:1 multipl:2? Revisar
+    'setEXTTHHumidityLowCond':   {'type': "8C", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setEXTTHHumidityHighCond':  {'type': "8D", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    #New addition to configure max_payload_size 15-01-2026
+    'setMaxPayloadSize': {'type': "8E", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
+    #New addition to configure parameters of the new version of Isurlog v3: SoC, CRate, VDCVoltage, Theft alert
+    'setBatteryInputSoC': {'type': "8F", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setBatteryInputCRate': {'type': "90", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setVDCVoltage': {'type': "91", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
+    'setTheftAlert': {'type': "92", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+     #New addition to configure Wireless parameter: MQTT server, WiFi credentials, Nb-IoT connection parameters, LoRaWAN class. --> Only via Bluetooh.
+    'setAPN': {'type': "93", 'size': 0, 'multipl': 1, 'signed': False},
+    'setExternalSIM': {'type': "94", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setConPreference': {'type': "95", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 2},
+    'setWiFiSSID': {'type': "96", 'size': 0, 'multipl': 1, 'signed': False},
+    'setWiFiPsswd': {'type': "97", 'size': 0, 'multipl': 1, 'signed': False},
+    'setLoRaWANClass': {'type': "98", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 2},
+    'setMQTTIP':        {'type': "99", 'size': 0, 'multipl': 1, 'signed': False},
+    'setMQTTPort':      {'type': "9A", 'size': 0, 'multipl': 1, 'signed': False},
+    'setMQTTUser':      {'type': "9B", 'size': 0, 'multipl': 1, 'signed': False},
+    'setMQTTPasswd':    {'type': "9C", 'size': 0, 'multipl': 1, 'signed': False},
+    'setMQTTBaseTopic': {'type': "9D", 'size': 0, 'multipl': 1, 'signed': False},
+    'setSignalData': {'type': "9E", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    #New addtion to configure LIS2DH12 accelerometer parameters 02-05-26
+    'setAccelEnable': {'type': "00", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setAccellowCond': {'type': "01", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setAccelhighCond': {'type': "02", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+    'setAccelLow':    {'type': "03", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    'setAccelHigh':    {'type': "04", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
+    #New addtion to enable user scripts.
+    'setUserScriptEnable':    {'type': "05", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
+}
+
+def _prepare_types():
+    #Derived fields, computed once at import: the type code as a byte value and the
+    #struct format of a single value ('size' 6 and 9 hold three values; 3-byte values
+    #and strings have no struct format)
+    pack_formats = {1: 'B', 2: 'H', 4: 'I', 6: 'H', 8: 'Q'}
+    for types in (_SENSOR_TYPES, _CONFIG_TYPES):
+        for info in types.values():
+            info['type_byte'] = int(info['type'], 16)
+            fmt = pack_formats.get(info['size'])
+            if fmt is not None:
+                fmt = '>' + (fmt.lower() if info['signed'] else fmt)
+            info['pack_fmt'] = fmt
+    #Value encoder per sensor type (range check, scaling and packing), and whether the
+    #type can take the 1-byte unsigned fast path
+    for info in _SENSOR_TYPES.values():
+        info['encode'] = _make_encoder(info['pack_fmt'], info['multipl'], info['min'], info['max'])
+        info['u8'] = info['size'] == 1 and not info['signed'] and info['multipl'] == 1
+    #Reverse lookup (type byte -> (name, info)) so decode() does not scan config_types per entry
+    return {info['type_byte']: (name, info) for name, info in _CONFIG_TYPES.items()}
+
+_CONFIG_BY_TYPE_BYTE = _prepare_types()
+
+#Upper bound of an encoded record: channel + type + 9 value bytes (GPS)
+_MAX_RECORD_SIZE = const(11)
+
+def _native_tables():
+    #The C module reads the type tables flattened to tuples. 'size' 6 and 9 hold
+    #three values of 2 and 3 bytes
+    sensors = {}
+    for name, info in _SENSOR_TYPES.items():
+        width = info['size'] // (info['arrLen'] - 2)
+        sensors[name] = (info['type_byte'], width, info['signed'], info['multipl'], info['min'], info['max'], info['arrLen'])
+    configs = {}
+    for type_byte, (name, info) in _CONFIG_BY_TYPE_BYTE.items():
+        configs[type_byte] = (name, info['size'], info['signed'], info['multipl'])
+    return sensors, configs
+
+if _isurlog_lpp is not None:
+    _NATIVE_SENSOR_TABLE, _NATIVE_CONFIG_TABLE = _native_tables()
+
 class IsurlogLPPEncoder:
     """
     Encodes data in the Isurlog LPP (LoRaWAN Payload Protocol) format.
     """
 
+    #Encode buffer shared by all instances (app code creates an encoder per message),
+    #grown on demand and reused so steady-state encoding does not allocate it
+    _buf = bytearray(256)
+
     def __init__(self):
-        #Sensor types
-        self.sensor_types = {
-            'addDigitalInput' : {'type':"00", 'size':1, 'multipl':1, 'signed':False, 'min':0, 'max':255, 'arrLen':3},
-            'addDigitalOutput' : {'type':"01", 'size':1, 'multipl':1, 'signed':False, 'min':0, 'max':255, 'arrLen':3},
-            'addAnalogInput' : {'type':"02", 'size':2, 'multipl':100, 'signed':True, 'min':-327.67, 'max':327.67, 'arrLen':3},
-            'addAnalogOutput' : {'type':"03", 'size':2, 'multipl':100, 'signed':True, 'min':-327.67, 'max':327.67, 'arrLen':3},
-            'addModbusInput' : {'type':"04", 'size':2, 'multipl':100, 'signed':True, 'min':-327.67, 'max':327.67, 'arrLen':3},
-            'addModbusGenericInput' : {'type':"05", 'size':2, 'multipl':1, 'signed':False, 'min':0, 'max':65534, 'arrLen':3},
-            'addTemperatureInput' : {'type':"66", 'size':2, 'multipl':10, 'signed':True, 'min':-3276.7, 'max':3276.7, 'arrLen':3},
-            'addTemperatureSensor' : {'type':"67", 'size':2, 'multipl':10, 'signed':True, 'min':-3276.7, 'max':3276.7, 'arrLen':3},
-            'addHumiditySensor' : {'type':"68", 'size':1, 'multipl':2, 'signed':False, 'min':0, 'max':100, 'arrLen':3},
-            'addAccelerometer' : {'type':"71", 'size':6, 'multipl':1000, 'signed':True, 'min':-32.768, 'max':32.767, 'arrLen':5},
-            'addVoltageInput' : {'type':"74", 'size':2, 'multipl':1, 'signed':False, 'min':0, 'max':65534, 'arrLen':3},
-            'addUnixTime' : {'type':"75", 'size':4, 'multipl':1, 'signed':False, 'min':0, 'max':4294967295, 'arrLen':3},
-            'addSoCInput'   : {'type':"76", 'size':2, 'multipl':10, 'signed':False, 'min':0, 'max':100.0, 'arrLen':3},
-            'addCRateInput' : {'type':"77", 'size':1, 'multipl':10, 'signed':True, 'min':-12.8, 'max':12.7, 'arrLen':3},
-            'addModemData' : {'type':"78", 'size':1, 'multipl':1, 'signed':False, 'min':0, 'max':255, 'arrLen':3},
-            'addScriptError' : {'type':"79", 'size':1, 'multipl':1, 'signed':False, 'min':0, 'max':1, 'arrLen':3},
-            'addGPSData': {'type':"88", 'size':9, 'multipl':10000, 'signed':True, 'min':-900000, 'max':900000, 'arrLen':5},
-        }
-        #Configuration types
-        self.config_types = {
-            'setLatencyTime':               {'type': "A0", 'size': 1, 'multipl': 1, 'signed': False, 'min': 1, 'max': 255},
-            'setRtcSync':                 {'type': "A1", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setRegisterMode':            {'type': "A2", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setRegisterAccumulator':     {'type': "A3", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
-            'setMagnetWakeup':            {'type': "A4", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setDebugLED':                {'type': "A5", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setLoRaWANDevEUI':           {'type': "A6", 'size': 8, 'multipl': 1, 'signed': False, 'min': 0, 'max': 0xFFFFFFFFFFFFFFFF},
-            'setLoRaWANAppEUI':           {'type': "A7", 'size': 8, 'multipl': 1, 'signed': False, 'min': 0, 'max': 0xFFFFFFFFFFFFFFFF},
-            'setLoRaWANAppKey':           {'type': "A8", 'size': 16, 'multipl': 1, 'signed': False, 'min': 0, 'max': 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF},
-            'setNB_IoTeDRX':              {'type': "A9", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setAnalogPreAcquisition':    {'type': "AA", 'size': 2, 'multipl': 1, 'signed': False, 'min': 0, 'max': 65535},
-            'setAnalogInputEnable':       {'type': "AB", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setAnalogInputZero':         {'type': "AC", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setAnalogInputFullScale':    {'type': "AD", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setAnalogInputLow':          {'type': "AE", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setAnalogInputHigh':         {'type': "AF", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setAnalogInputLowCond':      {'type': "B0", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setAnalogInputHighCond':     {'type': "B1", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setDigitalEnable':           {'type': "B2", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setDigitalCounter':          {'type': "B3", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setDigitalPulseWeight':      {'type': "B4", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
-            'setDigitalWake':             {'type': "B5", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
-            'setDigitalLow':              {'type': "B6", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
-            'setDigitalHigh':             {'type': "B7", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
-            'setDigitalLowCond':          {'type': "B8", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setDigitalHighCond':         {'type': "B9", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setModbusPreAcquisition':    {'type': "BA", 'size': 2, 'multipl': 1, 'signed': False, 'min': 0, 'max': 65535},
-            'setModbusInputEnable':       {'type': "BB", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setModbusInputSlaveAddress': {'type': "BC", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
-            'setModbusInputRegisterAddress':{'type': "BD", 'size': 2, 'multipl': 1, 'signed': False, 'min': 0, 'max': 65535},
-            'setModbusInputFc':           {'type': "BE", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
-            'setModbusInputNumberOfDecimals':{'type': "BF", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
-            'setModbusInputIsFP':         {'type': "C0", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setModbusInputInvert':       {'type': "C1", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setModbusInputOffset':       {'type': "C2", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setModbusInputLow':          {'type': "C3", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setModbusInputHigh':         {'type': "C4", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setModbusInputLowCond':      {'type': "C5", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setModbusInputHighCond':     {'type': "C6", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setPT100Enable':             {'type': "C7", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setPT100Wires':              {'type': "C8", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1}, # Debería ser min:2, max:4 ? Revisar definición
-            'setPT100Low':                {'type': "C9", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setPT100High':               {'type': "CA", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setPT100LowCond':            {'type': "CB", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setPT100HighCond':           {'type': "CC", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setINTTHEnable':            {'type': "CD", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setINTTHTemperatureLow':    {'type': "CE", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setINTTHTemperatureHigh':   {'type': "CF", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setINTTHTemperatureLowCond':{'type': "D0", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setINTTHTemperatureHighCond':{'type': "D1", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setINTTHHumidityLow':       {'type': "D2", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67}, # Originalmente size:1 multipl:2? Revisar
-            'setINTTHHumidityHigh':      {'type': "D3", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},# Originalmente size:1 multipl:2? Revisar
-            'setINTTHHumidityLowCond':   {'type': "D4", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setINTTHHumidityHighCond':  {'type': "D5", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            # ----------------- Isurnode Config Types -----------------
-            # -- Isurnode General --
-            'setIsurnodeEnable': {'type': "D6", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setIsurnodeSlaveAddress': {'type': "D7", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
-
-            # -- Isurnode Analog Config --
-            'setIsurnodeAnalogPreAcquisition': {'type': "D8", 'size': 2, 'multipl': 1, 'signed': False, 'min': 0, 'max': 65535},
-            'setIsurnodeAnalogTriggerAddress': {'type': "D9", 'size': 2, 'multipl': 1, 'signed': False, 'min': 0, 'max': 65535},
-            'setIsurnodeAnalogInputEnable': {'type': "DA", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setIsurnodeAnalogInputZero': {'type': "DB", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setIsurnodeAnalogInputFullScale': {'type': "DC", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setIsurnodeAnalogInputLow': {'type': "DD", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setIsurnodeAnalogInputHigh': {'type': "DE", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setIsurnodeAnalogInputLowCond': {'type': "DF", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setIsurnodeAnalogInputHighCond': {'type': "E0", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setIsurnodeAnalogInputAddress': {'type': "E1", 'size': 2, 'multipl': 1, 'signed': False, 'min': 0, 'max': 65535},
-
-            # -- Isurnode SHT30 Sensor --
-            'setIsurnodeSHT30Enable': {'type': "E2", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setIsurnodeSHT30TriggerAddress': {'type': "E3", 'size': 2, 'multipl': 1, 'signed': False, 'min': 0, 'max': 65535},
-            'setIsurnodeSHT30Address': {'type': "E4", 'size': 2, 'multipl': 1, 'signed': False, 'min': 0, 'max': 65535},
-            'setIsurnodeSHT30TempLow': {'type': "E5", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setIsurnodeSHT30TempHigh': {'type': "E6", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setIsurnodeSHT30TempLowCond': {'type': "E7", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setIsurnodeSHT30TempHighCond': {'type': "E8", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setIsurnodeSHT30HumLow': {'type': "E9", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setIsurnodeSHT30HumHigh': {'type': "EA", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setIsurnodeSHT30HumLowCond': {'type': "EB", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setIsurnodeSHT30HumHighCond': {'type': "EC", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-
-            # -- Isurnode Digital Outputs --
-            'setIsurnodeDigitalOutputEnable': {'type': "ED", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setIsurnodeDigitalOutputType': {'type': "EE", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
-            'setIsurnodeDigitalOutputLogicOp': {'type': "EF", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 2},
-            'setIsurnodeDigitalOutputOnTime': {'type': "FC", 'size': 2, 'multipl': 1, 'signed': False, 'min': 0, 'max': 65535},
-            
-            # (First output condition)
-            'setIsurnodeDigitalOutputCond1Enable': {'type': "F0", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setIsurnodeDigOutCond1Sensor': {'type': "F1", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
-            'setIsurnodeDigOutCond1Low': {'type': "F2", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setIsurnodeDigOutCond1High': {'type': "F3", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setIsurnodeDigOutCond1LowCond': {'type': "F4", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setIsurnodeDigOutCond1HighCond': {'type': "F5", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            
-            # (Second output condition)
-            'setIsurnodeDigitalOutputCond2Enable': {'type': "F6", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setIsurnodeDigOutCond2Sensor': {'type': "F7", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
-            'setIsurnodeDigOutCond2Low': {'type': "F8", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setIsurnodeDigOutCond2High': {'type': "F9", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setIsurnodeDigOutCond2LowCond': {'type': "FA", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setIsurnodeDigOutCond2HighCond': {'type': "FB", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-
-            'setModbusInputLongInt': {'type': "FE", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            #New additions for more flexible modbus inputs 06-11-2025
-            'setModbusInputBaudrate': {'type': "FF", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 4},
-            'setModbusInputDataBits': {'type': "80", 'size': 1, 'multipl': 1, 'signed': False, 'min': 7, 'max': 8},
-            'setModbusInputStopBits': {'type': "81", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 2},
-            'setModbusInputParity': {'type': "82", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 2},
-            #New addition to enable continious mode and configure number of loops per reading cycle 11-11-2025
-            'setContinuousMode': {'type': "83", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setLoopCycles': {'type': "84", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
-            #New addittion to enable external temperature and humidity sensors (BME280/BMP280/BME680)
-            'setEXTTHEnable':            {'type': "85", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setEXTTHTemperatureLow':    {'type': "86", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setEXTTHTemperatureHigh':   {'type': "87", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setEXTTHTemperatureLowCond':{'type': "88", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setEXTTHTemperatureHighCond':{'type': "89", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setEXTTHHumidityLow':       {'type': "8A", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67}, # Originalmente size:1 multipl:2? Revisar
-            'setEXTTHHumidityHigh':      {'type': "8B", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67}, # Originalmente size:1 multipl:2? Revisar
-            'setEXTTHHumidityLowCond':   {'type': "8C", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setEXTTHHumidityHighCond':  {'type': "8D", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            #New addition to configure max_payload_size 15-01-2026
-            'setMaxPayloadSize': {'type': "8E", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
-            #New addition to configure parameters of the new version of Isurlog v3: SoC, CRate, VDCVoltage, Theft alert
-            'setBatteryInputSoC': {'type': "8F", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setBatteryInputCRate': {'type': "90", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setVDCVoltage': {'type': "91", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 255},
-            'setTheftAlert': {'type': "92", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-             #New addition to configure Wireless parameter: MQTT server, WiFi credentials, Nb-IoT connection parameters, LoRaWAN class. --> Only via Bluetooh.
-            'setAPN': {'type': "93", 'size': 0, 'multipl': 1, 'signed': False},
-            'setExternalSIM': {'type': "94", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setConPreference': {'type': "95", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 2},
-            'setWiFiSSID': {'type': "96", 'size': 0, 'multipl': 1, 'signed': False},
-            'setWiFiPsswd': {'type': "97", 'size': 0, 'multipl': 1, 'signed': False},
-            'setLoRaWANClass': {'type': "98", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 2},
-            'setMQTTIP':        {'type': "99", 'size': 0, 'multipl': 1, 'signed': False},
-            'setMQTTPort':      {'type': "9A", 'size': 0, 'multipl': 1, 'signed': False},
-            'setMQTTUser':      {'type': "9B", 'size': 0, 'multipl': 1, 'signed': False},
-            'setMQTTPasswd':    {'type': "9C", 'size': 0, 'multipl': 1, 'signed': False},
-            'setMQTTBaseTopic': {'type': "9D", 'size': 0, 'multipl': 1, 'signed': False},
-            'setSignalData': {'type': "9E", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            #New addtion to configure LIS2DH12 accelerometer parameters 02-05-26
-            'setAccelEnable': {'type': "00", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setAccellowCond': {'type': "01", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setAccelhighCond': {'type': "02", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-            'setAccelLow':    {'type': "03", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            'setAccelHigh':    {'type': "04", 'size': 2, 'multipl': 100, 'signed': True, 'min': -327.68, 'max': 327.67},
-            #New addtion to enable user scripts.
-            'setUserScriptEnable':    {'type': "05", 'size': 1, 'multipl': 1, 'signed': False, 'min': 0, 'max': 1},
-        }
+        #The type tables are module-level and shared by every encoder instance
+        self.sensor_types = _SENSOR_TYPES
+        self.config_types = _CONFIG_TYPES
+        self._config_by_type_byte = _CONFIG_BY_TYPE_BYTE
         
     def encode(self, lpp):
         """
@@ -227,71 +350,75 @@ class IsurlogLPPEncoder:
                 print("Encoding failed.")
         """
         
-        payload = ""
-        onePayload = ""
-
-        for i in range(0,len(lpp)):
-            sensorInfo = self.sensor_types.get(lpp[i][1])
+        # Native fast path. It returns None on any invalid row, and the
+        # Python implementation below then reports the errors
+        if _isurlog_lpp is not None:
+            hex_payload = _isurlog_lpp.encode(lpp, _NATIVE_SENSOR_TABLE)
+            if hex_payload is not None:
+                return hex_payload
+
+        sensor_types = self.sensor_types
+        log_error = utils.log_error
+        # Records are written in place at 'off'; a record only advances it once
+        # all its values are valid, so a rejected one is overwritten by the next
+        payload = IsurlogLPPEncoder._buf
+        need = len(lpp) * _MAX_RECORD_SIZE
+        if need > len(payload):
+            payload.extend(bytes(need - len(payload)))
+        off = 0
+
+        for row in lpp:
+            channel = row[0]
+            name = row[1]
+            sensorInfo = sensor_types.get(name)
 
             if sensorInfo == None:
-                utils.log_error("Unknown type " + str(lpp[i][1]) + " in channel " + str(lpp[i][0]) + ".")
+                log_error("Unknown type " + str(name) + " in channel " + str(channel) + ".")
                 continue
 
-            if len(lpp[i]) != sensorInfo.get("arrLen"):
-                utils.log_error("Too few/many values in channel " + str(lpp[i][0]) + " of the type " + str(lpp[i][1]))
+            if len(row) != sensorInfo["arrLen"]:
+                log_error("Too few/many values in channel " + str(channel) + " of the type " + str(name))
+                continue
 
-            else:
-                try:
-                    onePayload += str(f'{lpp[i][0]:02x}')    # channel
-                except:
-                    utils.log_error("The channel number is in the wrong format!")
+            # Per-type constants, bound once per row instead of per value
+            stype = sensorInfo['type_byte']
+            encode_value = sensorInfo['encode']
+
+            # A single mask test rejects negative and >255 channels alike
+            if not isinstance(channel, int) or channel & ~0xFF:
+                log_error("The channel number is in the wrong format!")
+                continue
+
+            if sensorInfo['u8']:
+                value = row[2]
+                if type(value) == int and sensorInfo['min'] <= value <= sensorInfo['max']:
+                    off = _encode_u8(payload, off, channel, stype, value)
                     continue
 
-                onePayload += sensorInfo.get("type")          # sensor type
-
-                for j in range(2,len(lpp[i])):
-                    error = False
-                    value = lpp[i][j]
-
-                    if type(value) != int and type(value) != float:
-                        utils.log_error("The value in channel " + str(lpp[i][0]) + " of the type " + lpp[i][1] + " is not a number.")
-                        error = True
-                        break
-
-                    if not (value >= sensorInfo.get("min") and value <= sensorInfo.get("max")):
-                        utils.log_error("Value " + str(value) + " in channel " + str(lpp[i][0]) + " of the type " + lpp[i][1] + " is outside the " + str(sensorInfo.get("min")) + " - " + str(sensorInfo.get("max")) + " range!")
-                        error = True
-                        break
-                    valueConversion = int(value * sensorInfo.get("multipl"))
-
-                    # Signed conversion
-                    sign = False
-
-                    if value < 0:
-                        sign = True
-
-                    if sensorInfo.get("signed") & sign:
-                        valueConversion = valueConversion & 0xFFFF
-
-                    # Size
-                    if sensorInfo.get("size") == 1:
-                        onePayload += str(f'{valueConversion:02x}')[-2:]
-                    elif sensorInfo.get("size") == 2:
-                        onePayload += str(f'{valueConversion:04x}')[-4:]
-                    elif sensorInfo.get("size") == 4:
-                        onePayload += str(f'{valueConversion:08x}')[-8:]
-                    elif sensorInfo.get("size") == 6:
-                        onePayload += str(f'{valueConversion:04x}')[-4:]
-                    elif sensorInfo.get("size") == 9:
-                        onePayload += str(f'{valueConversion:06x}')[-6:]
-
-                if error == False:
-                    payload += onePayload
-                    onePayload = ""
-                else:
-                    onePayload = ""
+            payload[off] = channel    # channel
+            payload[off + 1] = stype  # sensor type
+            end = off + 2
+
+            for value in row[2:]:
+                error = False
+
+                if not isinstance(value, (int, float)):
+                    log_error("The value in channel " + str(channel) + " of the type " + name + " is not a number.")
+                    error = True
+                    break
 
-        return payload
+                packed = encode_value(value)
+                if packed is None:
+                    log_error("Value " + str(value) + " in channel " + str(channel) + " of the type " + name + " is outside the " + str(sensorInfo['min']) + " - " + str(sensorInfo['max']) + " range!")
+                    error = True
+                    break
+                payload[end:end + len(packed)] = packed
+                end += len(packed)
+
+            if error == False:
+                off = end
+
+        return ubinascii.hexlify(memoryview(payload)[:off]).decode()
     
 
     def decode(self, payload):
@@ -304,68 +431,84 @@ class IsurlogLPPEncoder:
 
         Returns:
             A list of dictionaries.  Each dictionary represent a decoded value
+
+        Records are decoded in order up to the first bad one (unknown type,
+        truncated value, or reaching into invalid hex), which is logged and
+        ends the list. String bytes map to one character each, and a string
+        cut short by the end of a valid payload keeps the bytes present.
         """
+        # Native fast path (returns None on malformed payloads, see encode())
+        if _isurlog_lpp is not None:
+            data = _isurlog_lpp.decode(payload, _NATIVE_CONFIG_TABLE)
+            if data is not None:
+                return data
+
+        config_by_type = self._config_by_type_byte
+        log_error = utils.log_error
+        log_info = utils.log_info
         data = []
+
+        try:
+            buf = _unhexlify_prefix(payload)
+        except Exception as e:
+            log_error(f"Error decoding payload {payload} error:{e}")
+            return data
+
+        # Strings and long keys are read through memoryview slices, which do
+        # not copy the payload bytes
+        mv = memoryview(buf)
+        n = len(buf)
+        # Set when invalid or odd-length hex was left out of buf
+        cut = n * 2 < len(payload)
         i = 0
-        while i < len(payload):
+        while i < n:
             try:
-                channel = int(payload[i:i+2], 16)  # Obtiene el canal
-                i += 2
-                sensor_type_hex = payload[i:i+2] #Obtiene el tipo
+                channel = buf[i]  # Obtiene el canal
+                type_byte = buf[i+1] #Obtiene el tipo
                 i += 2
 
-                sensor_type = None #Busca el tipo en base al type
-                for name, info in self.config_types.items():
-                    if info['type'] == sensor_type_hex:
-                        sensor_type = name
-                        sensor_info = info
-                        break
+                entry = config_by_type.get(type_byte) #Busca el tipo en base al type
 
-                if sensor_type is None:
-                    utils.log_error(f"Unknown sensor type: {sensor_type_hex}")
+                if entry is None:
+                    log_error(f"Unknown sensor type: {type_byte:02X}")
                     # Ignorar el dato desconocido y continuar (recomendado)
-                    raise ValueError(f"Unknown sensor type: {sensor_type_hex}")
+                    raise ValueError(f"Unknown sensor type: {type_byte:02X}")
+
+                sensor_type, sensor_info = entry
 
                 # --- Variable length handling (Strings) ---
                 if sensor_info['size'] == 0:
                     # Next byte is the length of the string
-                    str_len = int(payload[i:i+2], 16)
-                    i += 2
-                    value_hex = payload[i:i + str_len * 2]
-                    i += str_len * 2
-                    
-                    # Convert hex to string (ASCII)
-                    value_final = ""
-                    for k in range(0, len(value_hex), 2):
-                        value_final += chr(int(value_hex[k:k+2], 16))
+                    str_len = buf[i]
+                    i += 1
+                    if cut and i + str_len > n:
+                        raise ValueError("Truncated string")
+                    value_final = _bytes_to_str(mv[i:i + str_len])
+                    i += str_len
                 
                 # --- Fixed length handling (Numeric) ---
                 else:
                     size = sensor_info['size']
-                    value_hex = payload[i:i + size * 2]
-                    i += size * 2
-
-                    # Conversión del valor
-                    value_int = int(value_hex, 16)
-                    utils.log_info(f"Decoded data 0: {value_int}")
-                    
-                    if sensor_info['signed']:  #Comprobar si es signed
-                        # Convertir a entero con signo (complemento a 2)
-                        max_val = 2**(size * 8)
-                        if value_int >= max_val // 2:
-                            value_int -= max_val
-
-                    if sensor_info['multipl'] != 1:
-                        value_int = value_int / sensor_info['multipl']
-                    
-                    value_final = value_int
+                    pack_fmt = sensor_info['pack_fmt']
+                    if i + size > n:
+                        raise ValueError("Truncated value")
+
+                    # Conversión del valor (signed formats return the two's complement value)
+                    if pack_fmt is not None:
+                        value_int = struct.unpack_from(pack_fmt, buf, i)[0]
+                    else:
+                        # 16-byte keys have no struct format and are unsigned
+                        value_int = int.from_bytes(mv[i:i + size], 'big')
+                    i += size
+                    log_info(f"Decoded data 0: {value_int}")
+
+                    value_final = _decode_value(value_int, sensor_info['multipl'])
 
                 data.append({'channel': channel, 'name': sensor_type, 'value': value_final})
-                utils.log_info(f"Decoded data: {data}")
+                log_info(f"Decoded data: {data}")
                 
             except Exception as e:
-                utils.log_error(f"Error decoding payload at index {i} -->{payload[i:i+2]} error:{e}")
+                log_error(f"Error decoding payload at index {i * 2} -->{payload[i * 2:i * 2 + 2]} error:{e}")
                 break #Break
 
         return data
-
@@ -0,0 +1,194 @@
+'''
+_crontab_parse.py
+
+Field tables and crontab field parser used by crontab.py.
+
+Field values are returned as int bitmasks (bit v - _BIT_BASE[which] set
+when v is allowed), so no intermediate sets are built while parsing.
+
+Kept in its own module so that the parser, which runs once per field every
+time a CronTab is built, can be compiled to native code without pulling the
+rest of crontab.py along. The functions take everything they need as
+arguments (no closures), as required by the native emitter.
+'''
+
+import micropython
+from micropython import const
+
+_ranges = [
+    (0, 59),
+    (0, 59),
+    (0, 23),
+    (1, 31),
+    (1, 12),
+    (0, 6),
+    (1970, 2099),
+]
+
+ENTRIES = const(7)
+SECOND_OFFSET = const(0)
+MINUTE_OFFSET = const(1)
+HOUR_OFFSET = const(2)
+DAY_OFFSET = const(3)
+MONTH_OFFSET = const(4)
+WEEK_OFFSET = const(5)
+YEAR_OFFSET = const(6)
+
+# Value of bit 0 in each field's mask. Years count from the start of their
+# range, so that a year mask has 130 bits rather than over 2000
+_BIT_BASE = (0, 0, 0, 0, 0, 0, _ranges[YEAR_OFFSET][0])
+
+_attribute = [
+    'second',
+    'minute',
+    'hour',
+    'day',
+    'month',
+    'isoweekday',
+    'year'
+]
+_alternate = {
+    MONTH_OFFSET: {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+        'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov':11, 'dec':12},
+    WEEK_OFFSET: {'sun': 0, 'mon': 1, 'tue': 2, 'wed': 3, 'thu': 4, 'fri': 5,
+        'sat': 6},
+}
+def _assert(condition, message, *args):
+    if not condition:
+        if args:
+            message = message % args
+        raise ValueError(message)
+
+
+# this handles day of week/month abbreviations
+def _fix(which, entry, it, start, end_limit):
+    if which in _alternate and not it.isdigit():
+        if it in _alternate[which]:
+            return _alternate[which][it]
+    _assert(it.isdigit(),
+        "invalid range specifier: %r (%r)", it, entry)
+    it = int(it, 10)
+    _assert(start <= it <= end_limit,
+        "item value %r out of range [%r, %r]",
+        it, start, end_limit)
+    return it
+
+# bitmask of range(start, end + 1, step), start and end relative to the bit base
+def _bits(start, end, step):
+    mask = 0
+    for i in range(start, end + 1, step):
+        mask |= 1 << i
+    return mask
+
+# this handles individual items/ranges
+@micropython.native
+def _parse_piece(which, entry, it, _start, _end, _end_limit, increment, loop):
+    base = _BIT_BASE[which]
+    if '-' in it:
+        start, end = it.split('-')
+        start = _fix(which, entry, start, _start, _end_limit)
+        end = _fix(which, entry, end, _start, _end_limit)
+        # Allow "sat-sun"
+        if which in (DAY_OFFSET, WEEK_OFFSET) and end == 0:
+            end = 7
+    elif it == '*':
+        start = _start
+        end = _end
+    else:
+        start = _fix(which, entry, it, _start, _end_limit)
+        end = _end
+        if increment is None:
+            return 1 << (start - base)
+
+    _assert(_start <= start <= _end_limit,
+        "%s range start value %r out of range [%r, %r]",
+        _attribute[which], start, _start, _end_limit)
+    _assert(_start <= end <= _end_limit,
+        "%s range end value %r out of range [%r, %r]",
+        _attribute[which], end, _start, _end_limit)
+    if not loop:
+        _assert(start <= end,
+            "%s range start value %r > end value %r",
+            _attribute[which], start, end)
+
+    if increment and not loop:
+        next_value = start + increment
+        _assert(next_value <= _end_limit,
+                "first next value %r is out of range [%r, %r]",
+                next_value, start, _end_limit)
+
+    if start <= end:
+        return _bits(start - base, end - base, increment or 1)
+
+    # Original logic for looping range (e.g., 55-5 minutes)
+    # This is kept from the original library
+    right = _bits(_start - base, end - base, increment or 1)
+    left = _bits(start - base, _end - base, increment or 1)
+    return left | right
+
+@micropython.native
+def parse_crontab(which, entry, loop):
+    '''
+    This parses a single crontab field and returns the data necessary for
+    a matcher to accept the proper values.
+    '''
+    _start, _end = _ranges[which]
+    _end_limit = _end
+    # wildcards
+    if entry in ('*', '?'):
+        if entry == '?':
+            _assert(which in (DAY_OFFSET, WEEK_OFFSET),
+                "cannot use '?' in the %r field", _attribute[which])
+        return None, _end
+
+    # last day of the month
+    if entry == 'l':
+        _assert(which == DAY_OFFSET,
+            "you can only specify a bare 'L' in the 'day' field")
+        return None, _end
+
+    # for the days before the last day of the month
+    elif entry.startswith('z'):
+        _assert(which == DAY_OFFSET,
+            "you can only specify a leading 'Z' in the 'day' field")
+        es, _, ee = entry[1:].partition('-')
+        _assert((entry[1:].isdigit() and 0 <= int(es, 10) <= 7) or
+                (_ and es.isdigit() and ee.isdigit() and 0 <= int(es, 10) <= 7 and 1 <= int(ee, 10) <= 7 and es <= ee),
+            "<day> specifier must include a day number or range 0..7 in the 'day' field, you entered %r", entry)
+        return None, _end
+
+    # for the last 'friday' of the month, for example
+    elif entry.startswith('l'):
+        _assert(which == WEEK_OFFSET,
+            "you can only specify a leading 'L' in the 'weekday' field")
+        es, _, ee = entry[1:].partition('-')
+        _assert((entry[1:].isdigit() and 0 <= int(es, 10) <= 7) or
+                (_ and es.isdigit() and ee.isdigit() and 0 <= int(es, 10) <= 7 and 0 <= int(ee, 10) <= 7),
+            "last <day> specifier must include a day number or range 0..7 in the 'weekday' field, you entered %r", entry)
+        return None, _end
+
+    # allow Sunday to be specified as weekday 7
+    if which == WEEK_OFFSET:
+        _end_limit = 7
+
+    increment = None
+    # increments
+    if '/' in entry:
+        entry, increment = entry.split('/')
+        increment = int(increment, 10)
+        _assert(increment > 0,
+            "you can only use positive increment values, you provided %r",
+            increment)
+        _assert(increment <= _end_limit,
+                "increment value must be less than %r, you provided %r",
+                _end_limit, increment)
+
+    # handle singles and ranges
+    good = _parse_piece(which, entry, entry, _start, _end, _end_limit,
+        increment, loop)
+
+    # change Sunday to weekday 0
+    if which == WEEK_OFFSET and good & 0x80:
+        good = (good & 0x7f) | 1
+
+    return good, _end
@@ -13,8 +13,13 @@ Uses time.mktime() and time.localtime() for date calculations.
 '''
 
 from ucollections import namedtuple # MicroPython replacement
+import micropython
+from micropython import const
 import time
 from modules import utils
+from lib._crontab_parse import (_ranges, ENTRIES, SECOND_OFFSET, MINUTE_OFFSET,
+    HOUR_OFFSET, DAY_OFFSET, MONTH_OFFSET, WEEK_OFFSET, YEAR_OFFSET,
+    _attribute, _alternate, _assert, parse_crontab, _BIT_BASE)
 
 # --- MODIFICATION: Import and create PowerManager instance ---
 try:
@@ -32,67 +37,80 @@ except ImportError:
 # We use Unix timestamps (seconds since epoch) as the base.
 # time.time() in MicroPython (if RTC is set) returns seconds since 1970-01-01.
 
-SECOND = 1
-MINUTE = 60
-HOUR = 3600
-DAY = 86400
-WEEK = 604800
+SECOND = const(1)
+MINUTE = const(60)
+HOUR = const(3600)
+DAY = const(86400)
+WEEK = const(604800)
 # Approximations used by original logic for month/year steps
-_MONTH_APPROX = 28 * DAY
-_YEAR_APPROX = 365 * DAY
+_MONTH_APPROX = const(28 * DAY)
+
+def _days_from_civil(y, m, d):
+    # Days since 1970-01-01 of a (proleptic Gregorian) date, in closed form:
+    # months are counted from March so that the leap day falls at year end
+    if m < 3:
+        y -= 1
+        m += 12
+    return 365 * y + y // 4 - y // 100 + y // 400 + (153 * (m - 3) + 2) // 5 + d - 719469
+
+# Days from 1970-01-01 to the epoch of time.time()/time.localtime(), which is
+# 2000-01-01 on ports built without MICROPY_EPOCH_IS_1970 (such as the ESP32)
+_EPOCH_DAYS = _days_from_civil(time.gmtime(0)[0], 1, 1)
 
 class _MicroDateTime:
     """
     Internal replacement for datetime object.
     Wraps a Unix timestamp and provides necessary attributes/methods
-    by converting to a time tuple when needed.
+    from its time tuple, computed once at construction.
     """
-    __slots__ = '_ts', '_lt' # _ts = timestamp, _lt = localtime tuple
+    # _ts = timestamp, _lt = localtime tuple, _wd = weekday (Mon=0..Sun=6)
+    __slots__ = '_ts', '_lt', 'year', 'month', 'day', 'hour', 'minute', 'second', '_wd'
 
     def __init__(self, timestamp):
         self._ts = int(timestamp)
-        self._lt = None # Lazy load localtime tuple
-
-    def _ensure_lt(self):
-        # Lazily calculate localtime tuple only when an attribute is accessed
-        if self._lt is None:
-            self._lt = time.localtime(self._ts)
-
-    @property
-    def second(self): self._ensure_lt(); return self._lt[5]
-    @property
-    def minute(self): self._ensure_lt(); return self._lt[4]
-    @property
-    def hour(self): self._ensure_lt(); return self._lt[3]
-    @property
-    def day(self): self._ensure_lt(); return self._lt[2]
-    @property
-    def month(self): self._ensure_lt(); return self._lt[1] # 1-12
-    @property
-    def year(self): self._ensure_lt(); return self._lt[0]
+        # Plain attributes instead of properties: next() reads them on every
+        # iteration and attribute access is much cheaper than a property call
+        lt = self._lt = time.localtime(self._ts)
+        self.year, self.month, self.day, self.hour, self.minute, self.second, self._wd = \
+            lt[0], lt[1], lt[2], lt[3], lt[4], lt[5], lt[6] # month is 1-12
+
+    # Moves this instance to another timestamp in place. Only for objects owned
+    # by the caller (the search loop of next() steps a single instance)
+    _rebind = __init__
 
     def isoweekday(self):
         """Returns isoweekday (Mon=1, ..., Sun=7)"""
-        self._ensure_lt()
         # time.localtime() weekday is Mon=0..Sun=6
-        return self._lt[6] + 1
+        return self._wd + 1
 
     def replace(self, second=None, minute=None, hour=None, day=None, month=None, year=None, microsecond=None):
         # microsecond is ignored but present in original
-        self._ensure_lt()
-        lt = list(self._lt)
-        # lt tuple: (year, mon, mday, hour, min, sec, wday, yday)
-        if year   is not None: lt[0] = year
-        if month  is not None: lt[1] = month
-        if day    is not None: lt[2] = day
-        if hour   is not None: lt[3] = hour
-        if minute is not None: lt[4] = minute
-        if second is not None: lt[5] = second
-        # Note: wday (lt[6]) and yday (lt[7]) are part of the tuple.
-        # time.mktime() expects a tuple of at least 8 elements.
-        new_ts = time.mktime(tuple(lt))
+        if year   is None: year = self.year
+        if month  is None: month = self.month
+        if day    is None: day = self.day
+        if hour   is None: hour = self.hour
+        if minute is None: minute = self.minute
+        if second is None: second = self.second
+        # Timestamps are UTC, so the new one is computed directly instead of
+        # going through time.mktime()
+        new_ts = (_days_from_civil(year, month, day) - _EPOCH_DAYS) * DAY + hour * HOUR + minute * MINUTE + second
         return _MicroDateTime(new_ts)
 
+    # Sub-day equivalents of replace() for the search loop resets, returning the
+    # new timestamp. Timestamps are UTC, so they are plain integer arithmetic
+    # with no mktime() call
+    def _set_second(self, second):
+        ts = self._ts
+        return ts - ts % MINUTE + second
+
+    def _set_minute(self, minute):
+        ts = self._ts
+        return ts - ts % HOUR + ts % MINUTE + minute * MINUTE
+
+    def _set_hour(self, hour):
+        ts = self._ts
+        return ts - ts % DAY + ts % HOUR + hour * HOUR
+
     def __add__(self, other):
         # This implementation assumes 'other' is an integer (seconds)
         if not isinstance(other, (int, float)): raise TypeError("unsupported type")
@@ -113,7 +131,6 @@ class _MicroDateTime:
     
     def __repr__(self):
         # Provides a human-readable representation for debugging
-        self._ensure_lt()
         return "({:04d}-{:02d}-{:02d} {:02d}:{:02d}:{:02d})".format(
             self._lt[0], self._lt[1], self._lt[2],
             self._lt[3], self._lt[4], self._lt[5])
@@ -121,34 +138,18 @@ class _MicroDateTime:
 # --- End of MicroPython datetime replacements ---
 
 
-_ranges = [
-    (0, 59),
-    (0, 59),
-    (0, 23),
-    (1, 31),
-    (1, 12),
-    (0, 6),
-    (1970, 2099),
-]
-
-ENTRIES = len(_ranges)
-SECOND_OFFSET, MINUTE_OFFSET, HOUR_OFFSET, DAY_OFFSET, MONTH_OFFSET, WEEK_OFFSET, YEAR_OFFSET = range(ENTRIES)
-
-_attribute = [
-    'second',
-    'minute',
-    'hour',
-    'day',
-    'month',
-    'isoweekday',
-    'year'
-]
-_alternate = {
-    MONTH_OFFSET: {'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
-        'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov':11, 'dec':12},
-    WEEK_OFFSET: {'sun': 0, 'mon': 1, 'tue': 2, 'wed': 3, 'thu': 4, 'fri': 5,
-        'sat': 6},
-}
+# Field value of a _MicroDateTime per entry index (same order as _attribute)
+_accessors = (
+    lambda dt: dt.second,
+    lambda dt: dt.minute,
+    lambda dt: dt.hour,
+    lambda dt: dt.day,
+    lambda dt: dt.month,
+    # isoweekday() % 7 -> Mon=1..Sat=6, Sun=0, which matches the _alternate
+    # table logic (sun=0, mon=1)
+    lambda dt: (dt._wd + 1) % 7,
+    lambda dt: dt.year,
+)
 _aliases = {
     '@yearly':   '0 0 1 1 *',
     '@annually': '0 0 1 1 *',
@@ -157,6 +158,8 @@ _aliases = {
     '@daily':    '0 0 * * *',
     '@hourly':   '0 * * * *',
 }
+# Aliases already split, with the year field: only the second is missing
+_alias_fields = {alias: entry.split() + ['*'] for alias, entry in _aliases.items()}
 
 # Removed WARNING_CHANGE_MESSAGE
 # Removed sys.version_info check
@@ -164,12 +167,18 @@ _number_types = (int, float)
 xrange = range # for Python 3 compat
 # Removed WARN_CHANGE
 
+# Gregorian month lengths (February of a common year)
+_MDAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def _days_in_month(year, month):
+    if month == 2 and (year & 3) == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return _MDAYS[month - 1]
+
 # find the next scheduled time
 def _end_of_month(dt): # dt is _MicroDateTime
-    ndt = dt + DAY
-    while dt.month == ndt.month:
-        ndt += DAY
-    return ndt.replace(day=1) - DAY # returns _MicroDateTime
+    # Last day of dt's month, same time of day
+    return dt.replace(day=_days_in_month(dt.year, dt.month)) # returns _MicroDateTime
 
 def _month_incr(dt, m): # dt is _MicroDateTime
     odt = dt
@@ -181,40 +190,35 @@ def _month_incr(dt, m): # dt is _MicroDateTime
     return dt - odt # Returns int (seconds)
 
 def _year_incr(dt, m): # dt is _MicroDateTime
-    # simple leapyear stuff works for 1970-2099 :)
-    mod = dt.year % 4
-    leap_day_secs = 0
-    if mod == 0 and (dt.month, dt.day) < (2, 29):
-        leap_day_secs = DAY
-    if mod == 3 and (dt.month, dt.day) > (2, 29):
-        leap_day_secs = DAY
-    return _YEAR_APPROX + leap_day_secs # Return int (seconds)
+    # Exactly to January 1st of next year, 00:00:00
+    return (_days_from_civil(dt.year + 1, 1, 1) - _EPOCH_DAYS) * DAY - dt._ts # Return int (seconds)
 
+# Per field: the step (int seconds for fixed steps, else a function of
+# (dt, matchers) returning it), then the resets of the lower fields (functions
+# of (dt, step) returning the new timestamp)
 _increments = [
-    lambda *a: SECOND,
-    lambda *a: MINUTE,
-    lambda *a: HOUR,
-    lambda *a: DAY,
+    SECOND,
+    MINUTE,
+    HOUR,
+    DAY,
     _month_incr,
-    lambda *a: DAY,
+    DAY,
     _year_incr,
-    lambda dt,x: dt.replace(second=0),
-    lambda dt,x: dt.replace(minute=0),
-    lambda dt,x: dt.replace(hour=0),
-    lambda dt,x: dt.replace(day=1) if x > DAY else dt,
-    lambda dt,x: dt.replace(month=1) if x > DAY else dt,
-    lambda dt,x: dt,
+    lambda dt,x: dt._set_second(0),
+    lambda dt,x: dt._set_minute(0),
+    lambda dt,x: dt._set_hour(0),
+    lambda dt,x: dt.replace(day=1)._ts if x > DAY else dt._ts,
+    lambda dt,x: dt.replace(month=1)._ts if x > DAY else dt._ts,
+    lambda dt,x: dt._ts,
 ]
 
 # find the previously scheduled time
 def _day_decr(dt, m): # dt is _MicroDateTime
     if m.day.input != 'l':
         return -DAY
-    odt = dt
-    ndt = dt = dt - DAY
-    while dt.month == ndt.month:
-        dt -= DAY
-    return dt - odt # Returns int (seconds)
+    # Back to the last day of the month before the one of yesterday
+    ndt = dt - DAY
+    return (ndt.replace(day=1) - DAY) - dt # Returns int (seconds)
 
 def _month_decr(dt, m): # dt is _MicroDateTime
     odt = dt
@@ -223,50 +227,35 @@ def _month_decr(dt, m): # dt is _MicroDateTime
     return dt - odt # Returns int (seconds)
 
 def _year_decr(dt, m): # dt is _MicroDateTime
-    # simple leapyear stuff works for 1970-2099 :)
-    mod = dt.year % 4
-    leap_day_secs = 0
-    if mod == 0 and (dt.month, dt.day) > (2, 29):
-        leap_day_secs = DAY
-    if mod == 1 and (dt.month, dt.day) < (2, 29):
-        leap_day_secs = DAY
-    return -(_YEAR_APPROX + leap_day_secs) # Return int (seconds)
+    # Exactly to December 31st of last year, 23:59:59
+    return (_days_from_civil(dt.year, 1, 1) - _EPOCH_DAYS) * DAY - 1 - dt._ts # Return int (seconds)
 
 def _day_decr_reset(dt, x): # dt is _MicroDateTime
     if x >= -DAY:
-        return dt
-    cur = dt.month
-    while dt.month == cur:
-        dt += DAY
-    return dt - DAY
+        return dt._ts
+    return _end_of_month(dt)._ts
 
 _decrements = [
-    lambda *a: -SECOND,
-    lambda *a: -MINUTE,
-    lambda *a: -HOUR,
+    -SECOND,
+    -MINUTE,
+    -HOUR,
     _day_decr,
     _month_decr,
-    lambda *a: -DAY,
+    -DAY,
     _year_decr,
-    lambda dt,x: dt.replace(second=59),
-    lambda dt,x: dt.replace(minute=59),
-    lambda dt,x: dt.replace(hour=23),
+    lambda dt,x: dt._set_second(59),
+    lambda dt,x: dt._set_minute(59),
+    lambda dt,x: dt._set_hour(23),
     _day_decr_reset,
-    lambda dt,x: dt.replace(month=12) if x < -DAY else dt,
-    lambda dt,x: dt,
+    lambda dt,x: dt.replace(month=12)._ts if x < -DAY else dt._ts,
+    lambda dt,x: dt._ts,
     _year_decr,
 ]
 
 Matcher = namedtuple('Matcher', 'second, minute, hour, day, month, weekday, year')
 
-def _assert(condition, message, *args):
-    if not condition:
-        if args:
-            message = message % args
-        raise ValueError(message)
-
 class _Matcher(object):
-    __slots__ = 'allowed', 'end', 'any', 'input', 'which', 'split', 'loop'
+    __slots__ = 'allowed', 'end', 'any', 'input', 'which', 'split', 'loop', '_simple', '_mask', '_base'
     def __init__(self, which, entry, loop=False):
         """
         input:
@@ -280,22 +269,33 @@ class _Matcher(object):
         self.input = entry.lower()
         self.split = self.input.split(',')
         self.which = which
-        self.allowed = set()
         self.end = None
         self.any = '*' in self.split or '?' in self.split
         self.loop = loop
 
+        # Allowed values packed as bits: 'v in allowed' is
+        # '(_mask >> (v - _base)) & 1' (_base is only non-zero for years)
+        mask = 0
         for it in self.split:
-            al, en = self._parse_crontab(which, it)
+            al, en = parse_crontab(which, it, self.loop)
             if al is not None:
-                self.allowed.update(al)
+                mask |= al
             self.end = en
         _assert(self.end is not None,
             "improper item specification: %r", entry.lower()
         )
-        self.allowed = frozenset(self.allowed)
+        self._mask = mask
+        base = self._base = _BIT_BASE[which]
+        self.allowed = frozenset(v for v in range(_ranges[which][0], self.end + 1)
+                                 if (mask >> (v - base)) & 1)
+        # Most matchers have no 'L'/'Z' items: __call__ can skip the item loop
+        self._simple = not any(x.startswith('l') or x.startswith('z') for x in self.split)
 
     def __call__(self, v, dt): # dt is _MicroDateTime
+        # Years below the range (v < _base) would make a negative shift
+        d = v - self._base
+        if self._simple:
+            return self.any or d >= 0 and (self._mask >> d) & 1
         for i, x in enumerate(self.split):
             if x == 'l':
                 if v == _end_of_month(dt).day:
@@ -332,7 +332,7 @@ class _Matcher(object):
                 if v in set(eom - i for i in range(start, end+1)):
                     return True
 
-        return self.any or v in self.allowed
+        return self.any or d >= 0 and (self._mask >> d) & 1
 
     def __lt__(self, other):
         if self.any:
@@ -354,135 +354,76 @@ class _Matcher(object):
     def __hash__(self):
         return hash((self.any, self.allowed))
 
-    def _parse_crontab(self, which, entry):
-        '''
-        This parses a single crontab field and returns the data necessary for
-        this matcher to accept the proper values.
-        '''
+def _matcher_key(m):
+    # What makes two _Matchers equal: nothing for wildcards, otherwise the
+    # allowed values, plus the items themselves when there are 'L'/'Z' ones
+    if m.any:
+        return None
+    return m._mask if m._simple else (m._mask, m.input)
+
+@micropython.native
+def _next_search(crontab, future, increments, backwards): # future is _MicroDateTime
+    """
+    Search loop of CronTab.next(): steps 'future' field by field until every
+    matcher accepts it. Returns the matching _MicroDateTime, or None once past
+    the year range. Compiled by the native emitter (hot path of next()).
 
-        # this handles day of week/month abbreviations
-        def _fix(it):
-            if which in _alternate and not it.isdigit():
-                if it in _alternate[which]:
-                    return _alternate[which][it]
-            _assert(it.isdigit(),
-                "invalid range specifier: %r (%r)", it, entry)
-            it = int(it, 10)
-            _assert(_start <= it <= _end_limit,
-                "item value %r out of range [%r, %r]",
-                it, _start, _end_limit)
-            return it
-
-        # this handles individual items/ranges
-        def _parse_piece(it):
-            if '-' in it:
-                start, end = map(_fix, it.split('-'))
-                # Allow "sat-sun"
-                if which in (DAY_OFFSET, WEEK_OFFSET) and end == 0:
-                    end = 7
-            elif it == '*':
-                start = _start
-                end = _end
-            else:
-                start = _fix(it)
-                end = _end
-                if increment is None:
-                    return set([start])
-
-            _assert(_start <= start <= _end_limit,
-                "%s range start value %r out of range [%r, %r]",
-                _attribute[which], start, _start, _end_limit)
-            _assert(_start <= end <= _end_limit,
-                "%s range end value %r out of range [%r, %r]",
-                _attribute[which], end, _start, _end_limit)
-            if not self.loop:
-                _assert(start <= end,
-                    "%s range start value %r > end value %r",
-                    _attribute[which], start, end)
-
-            if increment and not self.loop:
-                next_value = start + increment
-                _assert(next_value <= _end_limit,
-                        "first next value %r is out of range [%r, %r]",
-                        next_value, start, _end_limit)
-
-            if start <= end:
-                return set(range(start, end+1, increment or 1))
-
-            # Original logic for looping range (e.g., 55-5 minutes)
-            # This is kept from the original library
-            right = set(range(_start, end + 1, increment or 1))
-            left = set(range(start, _end + 1, increment or 1))
-            return left | right
-
-
-        _start, _end = _ranges[which]
-        _end_limit = _end
-        # wildcards
-        if entry in ('*', '?'):
-            if entry == '?':
-                _assert(which in (DAY_OFFSET, WEEK_OFFSET),
-                    "cannot use '?' in the %r field", _attribute[which])
-            return None, _end
-
-        # last day of the month
-        if entry == 'l':
-            _assert(which == DAY_OFFSET,
-                "you can only specify a bare 'L' in the 'day' field")
-            return None, _end
-
-        # for the days before the last day of the month
-        elif entry.startswith('z'):
-            _assert(which == DAY_OFFSET,
-                "you can only specify a leading 'Z' in the 'day' field")
-            es, _, ee = entry[1:].partition('-')
-            _assert((entry[1:].isdigit() and 0 <= int(es, 10) <= 7) or
-                    (_ and es.isdigit() and ee.isdigit() and 0 <= int(es, 10) <= 7 and 1 <= int(ee, 10) <= 7 and es <= ee),
-                "<day> specifier must include a day number or range 0..7 in the 'day' field, you entered %r", entry)
-            return None, _end
-
-        # for the last 'friday' of the month, for example
-        elif entry.startswith('l'):
-            _assert(which == WEEK_OFFSET,
-                "you can only specify a leading 'L' in the 'weekday' field")
-            es, _, ee = entry[1:].partition('-')
-            _assert((entry[1:].isdigit() and 0 <= int(es, 10) <= 7) or
-                    (_ and es.isdigit() and ee.isdigit() and 0 <= int(es, 10) <= 7 and 0 <= int(ee, 10) <= 7),
-                "last <day> specifier must include a day number or range 0..7 in the 'weekday' field, you entered %r", entry)
-            return None, _end
-
-        # allow Sunday to be specified as weekday 7
-        if which == WEEK_OFFSET:
-            _end_limit = 7
-
-        increment = None
-        # increments
-        if '/' in entry:
-            entry, increment = entry.split('/')
-            increment = int(increment, 10)
-            _assert(increment > 0,
-                "you can only use positive increment values, you provided %r",
-                increment)
-            _assert(increment <= _end_limit,
-                    "increment value must be less than %r, you provided %r",
-                    _end_limit, increment)
-
-        # handle singles and ranges
-        good = _parse_piece(entry)
-
-        # change Sunday to weekday 0
-        if which == WEEK_OFFSET and 7 in good:
-            good.discard(7)
-            good.add(0)
-
-        return good, _end
+    The search works on the timestamp and moves 'future' in place instead of
+    allocating a _MicroDateTime per step, so 'future' must be owned by the caller.
+    """
+    matchers = crontab.matchers
+    test_match = crontab._test_match
+    ts = future._ts
+    to_test = ENTRIES - 1
+    while to_test >= 0:
+        if not test_match(to_test, future):
+            inc = increments[to_test] # inc is int (seconds)
+            if type(inc) is not int:
+                inc = inc(future, matchers)
+            ts += inc
+            future._rebind(ts)
+            for i in range(0, to_test):
+                reset_ts = increments[ENTRIES+i](future, inc)
+                if reset_ts != ts:
+                    ts = reset_ts
+                    future._rebind(ts)
+            try:
+                if backwards:
+                    past_end = future.year < matchers.year
+                else:
+                    past_end = matchers.year < future.year
+            except Exception as e:
+                utils.log_error(future, type(future), type(inc))
+                raise e # bare 'raise' is not supported by the native emitter
+            if past_end:
+                return None # Reached end of time
+            to_test = ENTRIES-1
+            continue
+        to_test -= 1
+    return future
+
+# --- MODIFICATION: Cache the PowerManager time for a short window ---
+# Bursts of CronTab constructions / next() / test() calls reuse one RTC read
+# instead of one I2C transaction each. Set _cache_ttl_ms = 0 to disable.
+_cache_ttl_ms = 500
+_now_cache = [None, 0] # [timestamp, time.ticks_ms() of the read]
+
+def _pm_unix_time():
+    t = time.ticks_ms()
+    if _now_cache[0] is not None and time.ticks_diff(t, _now_cache[1]) < _cache_ttl_ms:
+        return _now_cache[0]
+    ts = _pm_instance.get_unix_time()
+    _now_cache[0] = ts
+    _now_cache[1] = t
+    return ts
+# --- END OF MODIFICATION ---
 
 # --- MODIFICATION: Use _pm_instance for _gv ---
 def _get_random_second():
     ts = 0
     if _pm_instance:
         try:
-            ts = _pm_instance.get_unix_time()
+            ts = _pm_unix_time()
         except Exception:
             pass # Will use fallback
     
@@ -498,39 +439,50 @@ _gv = _get_random_second
 # --- END OF MODIFICATION ---
 
 
+# Parsed matchers per (crontab, loop), shared by every CronTab built from the
+# same expression (the matchers are never modified after parsing). Entries with
+# random seconds are not cached, each of them draws its own second.
+_CACHE_ENABLED = True
+_CRONTAB_CACHE_SIZE = const(16)
+_CRONTAB_CACHE = {}
+
 class CronTab(object):
-    __slots__ = 'matchers', 'rs'
+    __slots__ = 'matchers', 'rs', '_sig'
     def __init__(self, crontab, loop=False, random_seconds=False):
         self.rs = random_seconds
-        self.matchers = self._make_matchers(crontab, loop, random_seconds)
+        cache = _CACHE_ENABLED and not random_seconds
+        key = (crontab, loop)
+        matchers = _CRONTAB_CACHE.get(key) if cache else None
+        if matchers is None:
+            matchers = self._make_matchers(crontab, loop, random_seconds)
+            if cache:
+                if len(_CRONTAB_CACHE) >= _CRONTAB_CACHE_SIZE:
+                    # Evict one entry (MicroPython dicts have no insertion order)
+                    del _CRONTAB_CACHE[next(iter(_CRONTAB_CACHE))]
+                _CRONTAB_CACHE[key] = matchers
+        self.matchers = matchers
+        # Equality signature: the second is not compared with random_seconds
+        keys = tuple(_matcher_key(m) for m in matchers)
+        self._sig = (True,) + keys[1:] if random_seconds else (False,) + keys
 
     def __eq__(self, other):
         if not isinstance(other, CronTab):
             return False
-        # Compare matchers (which are _Matcher objects)
-        # Need to compare them field by field as 'matchers' is a namedtuple
-        match_last = (self.matchers.minute == other.matchers.minute and
-                      self.matchers.hour == other.matchers.hour and
-                      self.matchers.day == other.matchers.day and
-                      self.matchers.month == other.matchers.month and
-                      self.matchers.weekday == other.matchers.weekday and
-                      self.matchers.year == other.matchers.year)
-        
-        return match_last and ((self.rs and other.rs) or (not self.rs and
-            not other.rs and self.matchers.second == other.matchers.second))
+        return self._sig == other._sig
+
+    def __hash__(self):
+        return hash(self._sig)
 
     def _make_matchers(self, crontab, loop, random_seconds):
         '''
         This constructs the full matcher struct.
         '''
-        crontab = _aliases.get(crontab, crontab)
-        ct = crontab.split()
+        ct = _alias_fields.get(crontab) or crontab.split()
 
         if len(ct) == 5:
-            ct.insert(0, _gv() if random_seconds else '0')
-            ct.append('*')
+            ct = [_gv() if random_seconds else '0'] + ct + ['*']
         elif len(ct) == 6:
-            ct.insert(0, _gv() if random_seconds else '0')
+            ct = [_gv() if random_seconds else '0'] + ct
         _assert(len(ct) == 7,
             "improper number of cron entries specified; got %i need 5 to 7"%(len(ct,)))
 
@@ -543,25 +495,14 @@ class CronTab(object):
         This tests the given field for whether it matches with the current
         _MicroDateTime object passed.
         '''
-        at = _attribute[index] # e.g., 'isoweekday'
-        
-        if at == 'isoweekday':
-            attr = dt.isoweekday() # Call method
-        else:
-            attr = getattr(dt, at) # Get property
-        
-        if index == WEEK_OFFSET:
-            attr = attr % 7 # isoweekday() % 7 -> Mon=1..Sat=6, Sun=0
-            # This matches the _alternate table logic (sun=0, mon=1)
-        
-        return self.matchers[index](attr, dt)
+        return self.matchers[index](_accessors[index](dt), dt)
 
     # --- MODIFICATION: Use _pm_instance for current time ---
     def _default_now(self):
         # Adapted to use the global PowerManager instance if it exists
         if _pm_instance:
             try:
-                return _pm_instance.get_unix_time()
+                return _pm_unix_time()
             except Exception as e:
                 utils.log_error("Error in crontab _default_now (pm):", e)
                 # Attempt fallback
@@ -593,32 +534,13 @@ class CronTab(object):
         # Removed timezone logic
         onow, now = now, now
         
-        # Start 1 second in the future
-        future = now + increments[0]() # + 1 second
-        
-        if future < now:
-            # we are going backwards...
-            _test = lambda: future.year < self.matchers.year
-        else:
-            # we are going forwards
-            _test = lambda: self.matchers.year < future.year
-
-        to_test = ENTRIES - 1
-        while to_test >= 0:
-            if not self._test_match(to_test, future):
-                inc = increments[to_test](future, self.matchers) # inc is int (seconds)
-                future = future + inc
-                for i in xrange(0, to_test):
-                    future = increments[ENTRIES+i](future, inc)
-                try:
-                    if _test():
-                        return None # Reached end of time
-                except Exception as e:
-                    utils.log_error(future, type(future), type(inc))
-                    raise
-                to_test = ENTRIES-1
-                continue
-            to_test -= 1
+        # Start 1 second in the future (a new object, owned by the search)
+        future = now + increments[0] # + 1 second
+
+        # future < now: we are going backwards
+        future = _next_search(self, future, increments, future < now)
+        if future is None:
+            return None # Reached end of time
 
         # verify the match
         match = [self._test_match(i, future) for i in xrange(ENTRIES)]
@@ -5,24 +5,49 @@
 
 import collections
 import time
+import uctypes
+from micropython import const
 
 
 DateTimeTuple = collections.namedtuple("DateTimeTuple", ["year", "month",
     "day", "weekday", "hour", "minute", "second", "millisecond"])
 
 
+# Layout of the drivers' reusable decoded date/time buffer (see _read_datetime)
+_DT_DESCRIPTOR = {
+    "year": uctypes.UINT16 | 0,
+    "month": uctypes.UINT8 | 2,
+    "day": uctypes.UINT8 | 3,
+    "weekday": uctypes.UINT8 | 4,
+    "hour": uctypes.UINT8 | 5,
+    "minute": uctypes.UINT8 | 6,
+    "second": uctypes.UINT8 | 7,
+}
+
+
+# DS3231 registers, inlined by the compiler where the driver uses them
+_REG_DATETIME = const(0x00)
+_REG_CONTROL = const(0x0e)
+_REG_STATUS = const(0x0f)
+_REG_TEMPERATURE = const(0x11)
+_UEPOCH = const(946684800)
+
+
 def datetime_tuple(year=None, month=None, day=None, weekday=None, hour=None,
                    minute=None, second=None, millisecond=None):
     return DateTimeTuple(year, month, day, weekday, hour, minute,
                          second, millisecond)
 
 
-def _bcd2bin(value):
-    return (value or 0) - 6 * ((value or 0) >> 4)
+# BCD <-> binary lookup tables for register bytes (indexing is cheaper than the
+# arithmetic on MicroPython)
+_BCD2BIN = bytes((value - 6 * (value >> 4)) & 0xff for value in range(256))
+_BIN2BCD = bytes((value + 6 * (value // 10)) & 0xff for value in range(256))
 
 
-def _bin2bcd(value):
-    return (value or 0) + 6 * ((value or 0) // 10)
+def _twos_complement_10(value):
+    # Sign of a 10-bit two's complement value (DS3231 temperature, 0.25 C/LSB)
+    return value - 1024 if value & 0x200 else value
 
 
 def tuple2seconds(datetime):
@@ -42,6 +67,9 @@ class _BaseRTC:
     def __init__(self, i2c, address=0x68):
         self.i2c = i2c
         self.address = address
+        self._raw = bytearray(7)
+        self._dt_buf = bytearray(8)
+        self._dt = uctypes.struct(uctypes.addressof(self._dt_buf), _DT_DESCRIPTOR)
 
     def _register(self, register, buffer=None):
         if buffer is None:
@@ -59,81 +87,92 @@ class _BaseRTC:
         self._register(register, bytearray((data,)))
 
 
+    def _read_datetime(self):
+        # Reads and decodes the date/time registers into the reusable self._dt
+        # struct, with no allocation per read. The next read overwrites it
+        buffer = self._raw
+        self.i2c.readfrom_mem_into(self.address, self._DATETIME_REGISTER, buffer)
+        if self._SWAP_DAY_WEEKDAY:
+            day = buffer[3]
+            weekday = buffer[4]
+        else:
+            day = buffer[4]
+            weekday = buffer[3]
+        dt = self._dt
+        dt.year = _BCD2BIN[buffer[6]] + 2000
+        dt.month = _BCD2BIN[buffer[5]]
+        dt.day = _BCD2BIN[day]
+        dt.weekday = _BCD2BIN[weekday]
+        dt.hour = _BCD2BIN[buffer[2]]
+        dt.minute = _BCD2BIN[buffer[1]]
+        dt.second = _BCD2BIN[buffer[0]]
+        return dt
+
     def datetime(self, datetime=None):
         if datetime is None:
-            buffer = self.i2c.readfrom_mem(self.address,
-                                           self._DATETIME_REGISTER, 7)
-            if self._SWAP_DAY_WEEKDAY:
-                day = buffer[3]
-                weekday = buffer[4]
-            else:
-                day = buffer[4]
-                weekday = buffer[3]
-            return datetime_tuple(
-                year=_bcd2bin(buffer[6]) + 2000,
-                month=_bcd2bin(buffer[5]),
-                day=_bcd2bin(day),
-                weekday=_bcd2bin(weekday),
-                hour=_bcd2bin(buffer[2]),
-                minute=_bcd2bin(buffer[1]),
-                second=_bcd2bin(buffer[0]),
-            )
+            dt = self._read_datetime()
+            return datetime_tuple(dt.year, dt.month, dt.day, dt.weekday,
+                                  dt.hour, dt.minute, dt.second)
+        self._register(self._DATETIME_REGISTER, self._datetime_buffer(datetime))
+
+    def _datetime_buffer(self, datetime):
         datetime = datetime_tuple(*datetime)
         buffer = bytearray(7)
-        buffer[0] = _bin2bcd(datetime.second)
-        buffer[1] = _bin2bcd(datetime.minute)
-        buffer[2] = _bin2bcd(datetime.hour)
+        buffer[0] = _BIN2BCD[datetime.second]
+        buffer[1] = _BIN2BCD[datetime.minute]
+        buffer[2] = _BIN2BCD[datetime.hour]
         if self._SWAP_DAY_WEEKDAY:
-            buffer[4] = _bin2bcd(datetime.weekday)
-            buffer[3] = _bin2bcd(datetime.day)
+            buffer[4] = _BIN2BCD[datetime.weekday]
+            buffer[3] = _BIN2BCD[datetime.day]
         else:
-            buffer[3] = _bin2bcd(datetime.weekday)
-            buffer[4] = _bin2bcd(datetime.day)
-        buffer[5] = _bin2bcd(datetime.month)
-        buffer[6] = _bin2bcd(datetime.year - 2000)
-        self._register(self._DATETIME_REGISTER, buffer)
+            buffer[3] = _BIN2BCD[datetime.weekday]
+            buffer[4] = _BIN2BCD[datetime.day]
+        buffer[5] = _BIN2BCD[datetime.month]
+        buffer[6] = _BIN2BCD[datetime.year - 2000]
+        return buffer
 
 
 class DS3231(_BaseRTC):
-    _CONTROL_REGISTER = 0x0e
-    _STATUS_REGISTER = 0x0f
-    _DATETIME_REGISTER = 0x00
+    _CONTROL_REGISTER = _REG_CONTROL
+    _STATUS_REGISTER = _REG_STATUS
+    _DATETIME_REGISTER = _REG_DATETIME
     _ALARM_REGISTERS = (0x08, 0x0b)
-    _SQUARE_WAVE_REGISTER = 0x0e
-    _TEMPERATURE_REGISTER = 0x11
-    _uEPOCH = 946684800
+    _SQUARE_WAVE_REGISTER = _REG_CONTROL
+    _TEMPERATURE_REGISTER = _REG_TEMPERATURE
+    _uEPOCH = _UEPOCH
 
     def lost_power(self):
-        return self._flag(self._STATUS_REGISTER, 0b10000000)
+        return self._flag(_REG_STATUS, 0b10000000)
 
     def alarm(self, value=None, alarm=0):
-        return self._flag(self._STATUS_REGISTER,
+        return self._flag(_REG_STATUS,
                           0b00000011 & (1 << alarm), value)
 
     def interrupt(self, alarm=0):
-        return self._flag(self._CONTROL_REGISTER,
+        return self._flag(_REG_CONTROL,
                           0b00000100 | (1 << alarm), 1)
 
     def no_interrupt(self):
-        return self._flag(self._CONTROL_REGISTER, 0b00000011, 0)
+        return self._flag(_REG_CONTROL, 0b00000011, 0)
 
     def stop(self, value=None):
-        return self._flag(self._CONTROL_REGISTER, 0b10000000, value)
+        return self._flag(_REG_CONTROL, 0b10000000, value)
 
     def datetime(self, datetime=None):
-        if datetime is not None:
-            status = self._register(self._STATUS_REGISTER) & 0b01111111
-            self._register(self._STATUS_REGISTER, bytearray((status,)))
-        return super().datetime(datetime)
+        if datetime is None:
+            return super().datetime()
+        # Only the date/time registers are written; the status register is
+        # written back only when the oscillator stop flag has to be cleared,
+        # which is just the first set after a power loss
+        status = self._register(_REG_STATUS)
+        super().datetime(datetime)
+        if status & 0b10000000:
+            self._register(_REG_STATUS,
+                           bytearray((status & 0b01111111,)))
     
     def temperature(self):
-        def twos_complement(input_value: int, num_bits: int) -> int:
-            mask = 2 ** (num_bits - 1)
-            return -(input_value & mask) + (input_value & ~mask)
-
-        t = self.i2c.readfrom_mem(self.address, self._TEMPERATURE_REGISTER, 2)
-        i = t[0] << 8 | t[1]
-        return twos_complement(i >> 6, 10) * 0.25
+        t = self.i2c.readfrom_mem(self.address, _REG_TEMPERATURE, 2)
+        return _twos_complement_10(t[0] << 2 | t[1] >> 6) * 0.25
 
     def alarm_time(self, datetime=None, alarm=0):
         if datetime is None:
@@ -145,18 +184,18 @@ class DS3231(_BaseRTC):
             if buffer[2] & 0b10000000:
                 pass
             elif buffer[2] & 0b01000000:
-                day = _bcd2bin(buffer[2] & 0x3f)
+                day = _BCD2BIN[buffer[2] & 0x3f]
             else:
-                weekday = _bcd2bin(buffer[2] & 0x3f)
-            minute = (_bcd2bin(buffer[0] & 0x7f)
+                weekday = _BCD2BIN[buffer[2] & 0x3f]
+            minute = (_BCD2BIN[buffer[0] & 0x7f]
                       if not buffer[0] & 0x80 else None)
-            hour = (_bcd2bin(buffer[1] & 0x7f)
+            hour = (_BCD2BIN[buffer[1] & 0x7f]
                     if not buffer[1] & 0x80 else None)
             if alarm == 0:
                 # handle seconds
                 buffer = self.i2c.readfrom_mem(
                     self.address, self._ALARM_REGISTERS[alarm] - 1, 1)
-                second = (_bcd2bin(buffer[0] & 0x7f)
+                second = (_BCD2BIN[buffer[0] & 0x7f]
                           if not buffer[0] & 0x80 else None)
             return datetime_tuple(
                 day=day,
@@ -167,27 +206,27 @@ class DS3231(_BaseRTC):
             )
         datetime = datetime_tuple(*datetime)
         buffer = bytearray(3)
-        buffer[0] = (_bin2bcd(datetime.minute)
+        buffer[0] = (_BIN2BCD[datetime.minute]
                      if datetime.minute is not None else 0x80)
-        buffer[1] = (_bin2bcd(datetime.hour)
+        buffer[1] = (_BIN2BCD[datetime.hour]
                      if datetime.hour is not None else 0x80)
         if datetime.day is not None:
             if datetime.weekday is not None:
                 raise ValueError("can't specify both day and weekday")
-            buffer[2] = _bin2bcd(datetime.day)
+            buffer[2] = _BIN2BCD[datetime.day]
         elif datetime.weekday is not None:
-            buffer[2] = _bin2bcd(datetime.weekday) | 0b01000000
+            buffer[2] = _BIN2BCD[datetime.weekday] | 0b01000000
         else:
             buffer[2] = 0x80
         self._register(self._ALARM_REGISTERS[alarm], buffer)
         if alarm == 0:
             # handle seconds
-            buffer = bytearray([_bin2bcd(datetime.second)
+            buffer = bytearray([_BIN2BCD[datetime.second]
                                 if datetime.second is not None else 0x80])
             self._register(self._ALARM_REGISTERS[alarm] - 1, buffer)
 
     def get_unix_time(self):
-        time_tuple = self.datetime()
+        time_tuple = self._read_datetime()
         time_tuple_for_mktime = (
             time_tuple.year,
             time_tuple.month,
@@ -200,5 +239,5 @@ class DS3231(_BaseRTC):
         )
         unix_timestamp = time.mktime(time_tuple_for_mktime)
         
-        return unix_timestamp + self._uEPOCH
+        return unix_timestamp + _UEPOCH
 
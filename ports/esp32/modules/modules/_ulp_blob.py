@@ -0,0 +1,18 @@
+# src/modules/_ulp_blob.py
+
+# Copyright (C) 2026 ISURKI
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Generated by tools/assemble_ulp.py, do not edit.
+
+# ULP pulse counter program for each supported GPIO
+ULP_DIGITAL_BIN = {
+    36: b'ulp\x00\x0c\x00\xe0\x00\x00\x00\x1c\x00\x83\x03\x80r\x0c\x00\x00\xd0\xce\xab\x05\x82\xcd\xab\x0b\x82\x1f\x05\xec\x1d\x1f\x05\xcc\x19\xd0\xbc\x8ar\x0c\x00\x00h\xe3\x03\x80r\x0f\x00\x00\xd0<\x00\x80p\x10\x00\t\x82\t\x01\xb8.0\x00\xc0pH\x00\x00\x80\t\x01\xf8/\x0f\x01 r0\x00\xc0p\x10\x00@r\x93\x03\x80r\x0f\x00\x00\xd03\x00\x00p\x1f\x00@rt\x00@\x80\xb3\x03\x80r\xa2\x03\x80r\x0f\x00\x00\xd0\x0b\x00\x00h\x00\x00\x00\xb0\xa3\x03\x80r\x0e\x00\x00\xd0\n\x00\x00r\x90\x00@\x80\x1a\x00 r\x0e\x00\x00h\x00\x00\x00\xb0\xb3\x03\x80r\xa2\x03\x80r\x0f\x00\x00\xd0\x0b\x00\x00h\x93\x03\x80r\x0e\x00\x00\xd0\x1a\x00\x00r\x1a\x00@r\x0e\x00\x00h\xc3\x03\x80r\x0e\x00\x00\xd0\x1a\x00\x00r\x0e\x00\x00h\xd3\x03\x80r\x0f\x00\x00\xd0/\x00 p\xd8\x00@\x80\x00\x00\x00\xb0\x01\x00\x00\x90\x00\x00\x00\xb0',
+    39: b'ulp\x00\x0c\x00\xe0\x00\x00\x00\x1c\x00\x83\x03\x80r\x0c\x00\x00\xd0\xce\xab\x05\x82\xcd\xab\x0b\x82\x1f\x05`\x1c\x1f\x05\x10\x12\xd0\xbc\x8ar\x0c\x00\x00h\xe3\x03\x80r\x0f\x00\x00\xd0<\x00\x80p\x10\x00\t\x82\t\x01\xb8.0\x00\xc0pH\x00\x00\x80\t\x01\xf8/\x0f\x01 r0\x00\xc0p\x10\x00@r\x93\x03\x80r\x0f\x00\x00\xd03\x00\x00p\x1f\x00@rt\x00@\x80\xb3\x03\x80r\xa2\x03\x80r\x0f\x00\x00\xd0\x0b\x00\x00h\x00\x00\x00\xb0\xa3\x03\x80r\x0e\x00\x00\xd0\n\x00\x00r\x90\x00@\x80\x1a\x00 r\x0e\x00\x00h\x00\x00\x00\xb0\xb3\x03\x80r\xa2\x03\x80r\x0f\x00\x00\xd0\x0b\x00\x00h\x93\x03\x80r\x0e\x00\x00\xd0\x1a\x00\x00r\x1a\x00@r\x0e\x00\x00h\xc3\x03\x80r\x0e\x00\x00\xd0\x1a\x00\x00r\x0e\x00\x00h\xd3\x03\x80r\x0f\x00\x00\xd0/\x00 p\xd8\x00@\x80\x00\x00\x00\xb0\x01\x00\x00\x90\x00\x00\x00\xb0',
+}
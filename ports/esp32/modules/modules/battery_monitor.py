@@ -38,10 +38,13 @@ class BatteryMonitor:
             utils.log_error(f"Failed to initialize BatteryMonitor: {e}")
             self.adc = None #Set adc object to none if fails
 
-    def read_voltage(self):
+    def read_voltage(self, n=16):
         """
         Reads and returns the battery voltage.
 
+        Args:
+            n: Number of ADC samples averaged per reading.  Defaults to 16.
+
         Returns:
             The battery voltage in volts, or None if an error occurred.
         """
@@ -51,12 +54,17 @@ class BatteryMonitor:
             return None
 
         try:
-            adc_value = self.adc.read_uv()  # This method uses the known characteristics of the ADC and per-package eFuse value
+            read_uv = self.adc.read_uv  # This method uses the known characteristics of the ADC and per-package eFuse value
+            total = 0
+            for _ in range(n):
+                total += read_uv()
+            adc_value = total // n  # Oversampled to filter the ADC noise
             #Voltage Calculation with a 6dB attenuation, 
             #taking in consideration a voltage divider made by 2 resistors 5.9M and 3.6M
-            voltage = int(adc_value * (9.5 / 3600) )
+            #(integer math: uV * 9.5 / 3600 = uV * 95 // 36000 mV)
+            voltage = (adc_value * 95) // 36000
 
-            utils.log_info(f"Raw ADC value: {adc_value}, Calculated voltage: {voltage}mV")
+            utils.log_debug("Raw ADC value: %d, Calculated voltage: %dmV", adc_value, voltage)
 
             return voltage
 
@@ -19,51 +19,59 @@ import struct
 from modules.config_manager import config_manager
 
 _IO_CAPABILITY_DISPLAY_ONLY = const(0)
+# ESP32 maximum ATT MTU; a notification carries up to MTU - 3 bytes of value
+_ATT_MTU = const(247)
+_ATT_MTU_DEFAULT = const(23)
+_TX_BUF_SIZE = const(_ATT_MTU - 3)
+# Legacy advertising data size limit
+_ADV_MAX_LEN = const(31)
+# Advertising interval, doubled for every minute without a connection up to
+# _ADV_INTERVAL_US << _ADV_BACKOFF_MAX (2 s)
+_ADV_INTERVAL_US = const(250_000)
+_ADV_BACKOFF_MS = const(60_000)
+_ADV_BACKOFF_MAX = const(3)
 
 security.load_secrets()
 
 def _adv_payload_helper(name, services):
-    adv_payload = bytearray(b'\x02\x01\x06')
+    # Each payload is built by a single struct.pack
+    adv_payload = b'\x02\x01\x06'
 
     if services:
         uuid_bytes = bytes(services[0])
         uuid_len = len(uuid_bytes)
+        adv_payload = struct.pack('3sBB%ds' % uuid_len, adv_payload, uuid_len + 1,
+                                  0x07 if uuid_len == 16 else 0x03, uuid_bytes)
 
-        adv_payload += struct.pack('B', uuid_len + 1)
-
-        if uuid_len == 16:
-            adv_payload += b'\x07'
-        else:
-            adv_payload += b'\x03'
-
-        adv_payload += uuid_bytes
-
-    scan_rsp = bytearray()
+    scan_rsp = b''
     if name:
         name_bytes = name.encode()
-        scan_rsp += struct.pack('B', len(name_bytes) + 1)
-        scan_rsp += b'\x09'
-        scan_rsp += name_bytes
+        name_ad = struct.pack('BB%ds' % len(name_bytes), len(name_bytes) + 1,
+                              0x09, name_bytes)
+        # Put the name in the advertisement itself when it fits, so scanners
+        # do not need the extra scan request/response exchange
+        if len(adv_payload) + len(name_ad) <= _ADV_MAX_LEN:
+            adv_payload += name_ad
+        else:
+            scan_rsp = name_ad
 
     return adv_payload, scan_rsp
 
 
 class BLEManager:
+    _SERVICE_UUID = bluetooth.UUID('19b10000-e8f2-537e-4f6c-d104768a1214')
+    _DATA_PAYLOAD_CHAR_UUID = bluetooth.UUID('19b10001-e8f2-537e-4f6c-d104768a1214')
+    _COMMAND_CHAR_UUID = bluetooth.UUID('19b10002-e8f2-537e-4f6c-d104768a1214')
 
     def __init__(self, device_name="Isurlog-Datalogger", command_callback=None):
         self.device_name = device_name
         self.command_callback = command_callback
         self._loop = asyncio.get_event_loop()
         
-        ble.config(gap_name=self.device_name)
+        ble.config(gap_name=self.device_name, mtu=_ATT_MTU)
         
         pin = config_manager.static_config.get("pin", 123456)
         security.set_fixed_pin(pin)
-        
-        self._SERVICE_UUID = bluetooth.UUID('19b10000-e8f2-537e-4f6c-d104768a1214')
-        self._DATA_PAYLOAD_CHAR_UUID = bluetooth.UUID('19b10001-e8f2-537e-4f6c-d104768a1214')
-        self._COMMAND_CHAR_UUID = bluetooth.UUID('19b10002-e8f2-537e-4f6c-d104768a1214')
-        self._ADV_INTERVAL_MS = 250_000
 
         ble_service = aioble.Service(self._SERVICE_UUID)
 
@@ -83,30 +91,47 @@ class BLEManager:
 
         aioble.register_services(ble_service)
 
+        # Advertising data is fixed, build it once for every (re)start
+        self._adv_cache = _adv_payload_helper(self.device_name, [self._SERVICE_UUID])
+
+        # Set while a paired client is connected (see wait_connected)
+        self._subscribed = asyncio.Event()
+
         self._peripheral_task = self._loop.create_task(self._peripheral_task())
         self._command_handler_task = self._loop.create_task(self._command_handler_task())
 
         self.client_connected = False
         self.client_disconnected = False
 
+        # Link used to notify payloads longer than one notification, and the
+        # largest value a notification can carry on it (see update_data_payload)
+        self._connection = None
+        self._chunk = _ATT_MTU_DEFAULT - 3
+
+        # Reusable buffer for str payloads (see update_data_payload)
+        self._tx_buf = bytearray(_TX_BUF_SIZE)
+        self._tx_mv = memoryview(self._tx_buf)
+
         utils.log_info(f"BLEManager secure init: {self.device_name}")
 
     async def _peripheral_task(self):
         utils.log_info("Starting secure BLE advertising...")
 
-        adv_payload, scan_rsp_payload = _adv_payload_helper(
-            self.device_name,
-            [self._SERVICE_UUID]
-        )
+        adv_payload, scan_rsp_payload = self._adv_cache
+        backoff = 0
 
         while True:
             try:
+                # Advertising stops after each back-off step and restarts with
+                # the next interval; at the longest one it runs until a connection
                 async with await aioble.advertise(
-                    self._ADV_INTERVAL_MS,
+                    _ADV_INTERVAL_US << backoff,
                     adv_data=adv_payload,
                     resp_data=scan_rsp_payload,
+                    timeout_ms=None if backoff == _ADV_BACKOFF_MAX else _ADV_BACKOFF_MS,
                 ) as connection:
 
+                    backoff = 0
                     utils.log_info(f"BLE connected: {connection.device}")
 
                     try:
@@ -126,16 +151,35 @@ class BLEManager:
                         await connection.disconnect()
                         continue
 
+                    try:
+                        await connection.exchange_mtu()
+                    except Exception as e:
+                        # Already exchanged by the client, or not supported
+                        utils.log_warning(f"MTU exchange failed: {e}")
+                    self._chunk = (connection.mtu or _ATT_MTU_DEFAULT) - 3
+                    self._connection = connection
+                    utils.log_info(f"BLE notification size: {self._chunk}")
+
                     self.client_connected = True
+                    self._subscribed.set()
 
                     await connection.disconnected()
 
+                    self._subscribed.clear()
+                    self._connection = None
+                    self.client_connected = False
                     utils.log_info("BLE disconnected")
                     self.client_disconnected = True
 
+            except asyncio.TimeoutError:
+                # Nobody connected during this back-off step
+                backoff += 1
             except asyncio.CancelledError:
                 return
             except Exception as e:
+                self._subscribed.clear()
+                self._connection = None
+                self.client_connected = False
                 utils.log_error(f"BLE error: {e}")
                 await asyncio.sleep_ms(1000)
 
@@ -153,19 +197,50 @@ class BLEManager:
                 utils.log_info(f"BLE command: {data}")
 
                 if self.command_callback:
-                    self.command_callback(data)
+                    result = self.command_callback(data)
+                    # An async callback returns its coroutine: run it as a task
+                    # so that the next command can be received meanwhile
+                    if hasattr(result, "send"):
+                        self._loop.create_task(result)
 
             except asyncio.CancelledError:
                 return
             except Exception as e:
                 utils.log_error(f"Command error: {e}")
 
+    async def wait_connected(self):
+        # Returns as soon as a client has connected and paired
+        await self._subscribed.wait()
+
     def update_data_payload(self, payload):
+        # Nobody to notify (the value is rewritten on the next update anyway)
+        if not self._subscribed.is_set():
+            return
+
         try:
             if isinstance(payload, str):
-                payload = payload.encode()
+                # Copied into the reusable buffer instead of encoding a new
+                # bytes object per update (gatts_write copies the value)
+                data = memoryview(payload)
+                n = len(data)
+                if n <= _TX_BUF_SIZE:
+                    self._tx_mv[:n] = data
+                    payload = self._tx_mv[:n]
+                else:
+                    payload = payload.encode()
+
+            connection = self._connection
+            if connection is None or len(payload) <= self._chunk:
+                self.data_characteristic.write(payload, send_update=True)
+                return
 
-            self.data_characteristic.write(payload, send_update=True)
+            # Too long for one notification: keep the whole value for reads and
+            # notify it in MTU - 3 pieces rather than have it truncated
+            self.data_characteristic.write(payload)
+            data = memoryview(payload)
+            chunk = self._chunk
+            for i in range(0, len(data), chunk):
+                self.data_characteristic.notify(connection, data[i:i + chunk])
 
         except Exception as e:
             utils.log_error(f"BLE update error: {e}")
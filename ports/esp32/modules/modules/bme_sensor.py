@@ -12,12 +12,38 @@
 from machine import I2C, Pin
 from modules import utils
 from lib.pimoroni_bme680 import BME680, OS_2X, OS_4X, OS_8X, FILTER_SIZE_3, ENABLE_GAS_MEAS, SLEEP_MODE
+import array
 import json
 import time
+import uasyncio as asyncio
 from modules.config_manager import config_manager
 from lib.bme280_float import BME280
 
 
+def _i2c_cfg(sda_pin, scl_pin, i2c_freq):
+    """Returns the I2C settings, taking the ones not given from config.json or the defaults."""
+    static_config = config_manager.static_config
+    i2c = static_config.get("pinout", {}).get("i2c", {})
+    return (sda_pin if sda_pin is not None else i2c.get("sda_pin", 18),
+            scl_pin if scl_pin is not None else i2c.get("scl_pin", 19),
+            i2c_freq if i2c_freq is not None else static_config.get("i2c_freq", 100000))
+
+
+# I2C bus shared by the CHIP_ID probe and the sensor classes, with its settings
+_i2c_bus = None
+_i2c_bus_cfg = None
+
+
+def _get_i2c(sda_pin, scl_pin, i2c_freq):
+    """Returns the shared I2C bus, only (re)configuring it when the settings change."""
+    global _i2c_bus, _i2c_bus_cfg
+    cfg = (sda_pin, scl_pin, i2c_freq)
+    if _i2c_bus is None or _i2c_bus_cfg != cfg:
+        _i2c_bus = I2C(0, scl=Pin(scl_pin), sda=Pin(sda_pin), freq=i2c_freq)
+        _i2c_bus_cfg = cfg
+    return _i2c_bus
+
+
 def BME_CHIP_ID(sda_pin=None, scl_pin=None, i2c_freq=None, address=0x76):
     
     """
@@ -27,11 +53,9 @@ def BME_CHIP_ID(sda_pin=None, scl_pin=None, i2c_freq=None, address=0x76):
     - 0x61 (97) for BME680
     """
     
-    sda_pin = sda_pin if sda_pin is not None else config_manager.static_config.get("pinout", {}).get("i2c", {}).get("sda_pin", 18)
-    scl_pin = scl_pin if scl_pin is not None else config_manager.static_config.get("pinout", {}).get("i2c", {}).get("scl_pin", 19)
-    i2c_freq = i2c_freq if i2c_freq is not None else config_manager.static_config.get("i2c_freq", 100000)
+    sda_pin, scl_pin, i2c_freq = _i2c_cfg(sda_pin, scl_pin, i2c_freq)
     
-    i2c_bus = I2C(0, scl=Pin(scl_pin), sda=Pin(sda_pin), freq=i2c_freq)
+    i2c_bus = _get_i2c(sda_pin, scl_pin, i2c_freq)
     result = bytearray(1)
     i2c_bus.readfrom_mem_into(address, 0xd0, result)
     
@@ -50,12 +74,13 @@ class BME280Sensor:
         """
         
         # I2C configuration from config.json, or use defaults
-        self.sda_pin = sda_pin if sda_pin is not None else config_manager.static_config.get("pinout", {}).get("i2c", {}).get("sda_pin", 18)
-        self.scl_pin = scl_pin if scl_pin is not None else config_manager.static_config.get("pinout", {}).get("i2c", {}).get("scl_pin", 19)
-        self.i2c_freq = i2c_freq if i2c_freq is not None else config_manager.static_config.get("i2c_freq", 100000)
+        self.sda_pin, self.scl_pin, self.i2c_freq = _i2c_cfg(sda_pin, scl_pin, i2c_freq)
 
         # Initialize I2C bus
-        self.i2c_bus = I2C(0, scl=Pin(self.scl_pin), sda=Pin(self.sda_pin), freq=self.i2c_freq)
+        self.i2c_bus = _get_i2c(self.sda_pin, self.scl_pin, self.i2c_freq)
+
+        # Reused by read_values() so a reading does not allocate
+        self._values = array.array('f', (0.0, 0.0, 0.0))
         
         try:
             self.sensor = BME280(i2c=self.i2c_bus)
@@ -65,24 +90,19 @@ class BME280Sensor:
             utils.log_error(f"Failed to initialize BME280 sensor: {e}")
             self.sensor = None
             
-    def read_data(self):
+    def read_values(self):
         """
-        Reads the sensor data (temperature, pressure, humidity, gas resistance).
+        Reads the sensor data without building a dictionary.
 
         Returns:
-            A dictionary containing the sensor data, or None if an error occurred or if data is not ready."""
+            An array with temperature, pressure (hPa) and humidity, or None if
+            an error occurred. The same array is refilled on every call."""
 
         if self.sensor:
             try:
-                sensor_data = self.sensor.read_compensated_data()
-                
-                data = {
-                    "temperature": sensor_data[0],
-                    "pressure": sensor_data[1]/100,
-                    "humidity": sensor_data[2],
-                }
-
-                return data
+                values = self.sensor.read_compensated_data(self._values)
+                values[1] *= 0.01  # Pa to hPa, multiply is cheaper than divide
+                return values
             
             except Exception as e:
                 utils.log_error(f"Error reading BME280 sensor data: {e}")
@@ -90,10 +110,27 @@ class BME280Sensor:
         else:
             utils.log_error("BME280 sensor not initialized.")
             return None
+
+    def read_data(self):
+        """
+        Reads the sensor data (temperature, pressure, humidity, gas resistance).
+
+        Returns:
+            A dictionary containing the sensor data, or None if an error occurred or if data is not ready."""
+
+        values = self.read_values()
+        if values is None:
+            return None
+
+        return {
+            "temperature": values[0],
+            "pressure": values[1],
+            "humidity": values[2],
+        }
         
             
 class BME680Sensor:
-    def __init__(self, sda_pin=None, scl_pin=None, i2c_freq=None, address=0x76, IAQ=False):
+    def __init__(self, sda_pin=None, scl_pin=None, i2c_freq=None, address=0x76, IAQ=False, low_power=False):
         """
         Initializes the BME680 sensor.
 
@@ -103,21 +140,26 @@ class BME680Sensor:
             i2c_freq: The frequency for the I2C bus.
             address: The I2C address of the sensor (default: 0x76).
             IAQ: Boolean to determine if gas resistance measurement (IAQ calculation) should be enabled.
+            low_power: Boolean to force the sensor to sleep mode after every reading (ignored with IAQ).
         """
 
         # I2C configuration from config.json, or use defaults
-        self.sda_pin = sda_pin if sda_pin is not None else config_manager.static_config.get("pinout", {}).get("i2c", {}).get("sda_pin", 18)
-        self.scl_pin = scl_pin if scl_pin is not None else config_manager.static_config.get("pinout", {}).get("i2c", {}).get("scl_pin", 19)
-        self.i2c_freq = i2c_freq if i2c_freq is not None else config_manager.static_config.get("i2c_freq", 100000)
+        self.sda_pin, self.scl_pin, self.i2c_freq = _i2c_cfg(sda_pin, scl_pin, i2c_freq)
         self.IAQ = IAQ
+        self.low_power = low_power
         self.burn_in_data = []
         self.burn_in_time = 300  # Burn-in time in seconds
         self.gas_baseline = None
+        self._burn_in_task = None
         self.hum_baseline = 40.0
         self.hum_weighting = 0.25
+        # IAQ score constants (see calculate_iaq)
+        self._hum_score_max = self.hum_weighting * 100
+        self._gas_score_max = 100 - self._hum_score_max
+        self._hum_range_above = 100 - self.hum_baseline
 
         # Initialize I2C bus
-        self.i2c_bus = I2C(0, scl=Pin(self.scl_pin), sda=Pin(self.sda_pin), freq=self.i2c_freq)
+        self.i2c_bus = _get_i2c(self.sda_pin, self.scl_pin, self.i2c_freq)
 
         try:
             self.sensor = BME680(i2c_addr=address, i2c_device=self.i2c_bus)
@@ -134,6 +176,9 @@ class BME680Sensor:
                 self.sensor.set_gas_heater_temperature(320)
                 self.sensor.set_gas_heater_duration(150)
                 self.sensor.select_gas_heater_profile(0)
+                # The gas baseline is collected in the background, without
+                # blocking the event loop; read_data() skips IAQ until it is set
+                self._burn_in_task = asyncio.get_event_loop().create_task(self._burn_in())
             else:
                 self.sensor.set_gas_status(0) # Disable gas sensor
 
@@ -142,22 +187,25 @@ class BME680Sensor:
             utils.log_error(f"Failed to initialize BME680 sensor: {e}")
             self.sensor = None
 
-    def _burn_in(self):
-        """Performs the burn-in process for the gas sensor."""
+    async def _burn_in(self):
+        """Performs the burn-in process for the gas sensor (runs as a uasyncio task)."""
         utils.log_info("Collecting gas resistance burn-in data for 5 minutes...")
         start_time = time.time()
         curr_time = time.time()
-        burn_in_data = []
+        # Only the last 50 readings make the baseline: keep them in a ring
+        burn_in_data = array.array('f', (0.0 for _ in range(50)))
+        index = 0
 
         while curr_time - start_time < self.burn_in_time:
             curr_time = time.time()
             if self.sensor.get_sensor_data() and self.sensor.data.heat_stable:
                 gas = self.sensor.data.gas_resistance
-                burn_in_data.append(gas)
-                utils.log_info(f"Burn-in - Gas resistance: {gas} Ohms")
-                time.sleep(1)
+                burn_in_data[index] = gas
+                index = (index + 1) % 50
+                utils.log_debug("Burn-in - Gas resistance: %s Ohms", gas)
+            await asyncio.sleep(1)
 
-        self.gas_baseline = sum(burn_in_data[-50:]) / 50.0
+        self.gas_baseline = sum(burn_in_data) / 50.0
         utils.log_info(f"Gas baseline: {self.gas_baseline} Ohms, humidity baseline: {self.hum_baseline} %RH")
 
     def calculate_iaq(self, gas, hum):
@@ -171,25 +219,20 @@ class BME680Sensor:
         Returns:
             The IAQ score (0-100).
         """
-        gas_offset = self.gas_baseline - gas
+        # Calculate hum_score as the distance from the hum_baseline, relative
+        # to the room left on that side of it.
         hum_offset = hum - self.hum_baseline
-
-        # Calculate hum_score as the distance from the hum_baseline.
         if hum_offset > 0:
-            hum_score = (100 - self.hum_baseline - hum_offset)
-            hum_score /= (100 - self.hum_baseline)
-            hum_score *= (self.hum_weighting * 100)
+            hum_range = self._hum_range_above
         else:
-            hum_score = (self.hum_baseline + hum_offset)
-            hum_score /= self.hum_baseline
-            hum_score *= (self.hum_weighting * 100)
+            hum_range = self.hum_baseline
+        hum_score = (hum_range - abs(hum_offset)) / hum_range * self._hum_score_max
 
         # Calculate gas_score as the distance from the gas_baseline.
-        if gas_offset > 0:
-            gas_score = (gas / self.gas_baseline)
-            gas_score *= (100 - (self.hum_weighting * 100))
+        if gas < self.gas_baseline:
+            gas_score = gas / self.gas_baseline * self._gas_score_max
         else:
-            gas_score = 100 - (self.hum_weighting * 100)
+            gas_score = self._gas_score_max
 
         # Calculate air_quality_score.
         iaq_score = hum_score + gas_score
@@ -199,7 +242,8 @@ class BME680Sensor:
         """
         Reads the sensor data (temperature, pressure, humidity, gas resistance).
 
-        If IAQ is enabled, it performs a burn-in if necessary and calculates the IAQ score.
+        If IAQ is enabled, it calculates the IAQ score once the background burn-in
+        has set the gas baseline.
 
         Returns:
             A dictionary containing the sensor data, or None if an error occurred or if data is not ready.
@@ -227,10 +271,6 @@ class BME680Sensor:
         """
         if self.sensor:
             try:
-                # Perform burn-in if IAQ is enabled and gas baseline is not set
-                if self.IAQ and self.gas_baseline is None:
-                    self._burn_in()
-
                 if self.sensor.get_sensor_data():
                     temperature = self.sensor.data.temperature
                     pressure = self.sensor.data.pressure
@@ -242,15 +282,19 @@ class BME680Sensor:
                         "humidity": humidity,
                     }
 
-                    # Calculate IAQ if enabled and heater is stable
+                    # Calculate IAQ if enabled and heater is stable (the score
+                    # needs the gas baseline, which is set at the end of burn-in)
                     if self.IAQ and self.sensor.data.heat_stable:
                         gas_resistance = self.sensor.data.gas_resistance
-                        iaq_score = self.calculate_iaq(gas_resistance, humidity)
                         data["gas_resistance"] = gas_resistance
-                        data["iaq_score"] = iaq_score
-
-                    # Put sensor in sleep mode. BORRAR ESTA LINEA, PRUEBA CONSUMOS
-                    self.sensor.set_power_mode(SLEEP_MODE)
+                        if self.gas_baseline is not None:
+                            data["iaq_score"] = self.calculate_iaq(gas_resistance, humidity)
+
+                    # Forced mode already returns to sleep after each measurement, so
+                    # the extra register write is opt-in. Not with IAQ: the next
+                    # reading would need the heater ramp-up again
+                    if self.low_power and not self.IAQ:
+                        self.sensor.set_power_mode(SLEEP_MODE)
 
                     return data
                 else:
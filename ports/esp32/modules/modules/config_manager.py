@@ -10,8 +10,16 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import json
+import os
 from modules import utils
 
+# LoRaWAN keys arrive as integers and are stored as fixed width hex strings
+def _hex16(v):
+    return "%016X" % v
+
+def _hex32(v):
+    return "%032X" % v
+
 # Mapa que relaciona el nombre del tipo de configuración LPP con su ruta en el JSON.
 # '{channel}' se reemplaza por el índice del canal.
 CONFIG_MAP = {
@@ -32,9 +40,9 @@ CONFIG_MAP = {
     'setBatteryInputSoC': ('battery_config', 'soc', bool),
     'setBatteryInputCRate': ('battery_config', 'crate', bool),
     # LoRaWAN
-    'setLoRaWANDevEUI': ('communications', 'lorawan', 'dev_eui', lambda v: f"{v:016X}"),
-    'setLoRaWANAppEUI': ('communications', 'lorawan', 'app_eui', lambda v: f"{v:016X}"),
-    'setLoRaWANAppKey': ('communications', 'lorawan', 'app_key', lambda v: f"{v:032X}"),
+    'setLoRaWANDevEUI': ('communications', 'lorawan', 'dev_eui', _hex16),
+    'setLoRaWANAppEUI': ('communications', 'lorawan', 'app_eui', _hex16),
+    'setLoRaWANAppKey': ('communications', 'lorawan', 'app_key', _hex32),
     'setLoRaWANClass': ('communications', 'lorawan', 'class'),
     # NB-IoT
     'setNB_IoTeDRX': ('communications', 'nb_iot', 'edrx', bool),
@@ -168,6 +176,50 @@ CONFIG_MAP = {
     'setAccelHigh': ('accelerometer_config', 'axles', '{channel}', 'high'),
 }
 
+def _compile_path(path_info):
+    """
+    Splits a CONFIG_MAP entry into (path, channel_mask, converter).
+    Bit i of channel_mask is set when path[i] is the '{channel}' placeholder.
+    Raises ValueError for a malformed entry.
+    """
+    converter = None
+    if callable(path_info[-1]):
+        converter = path_info[-1]
+        path_info = path_info[:-1]
+
+    if not path_info:
+        raise ValueError(f"Empty CONFIG_MAP path: {path_info}")
+
+    channel_mask = 0
+    for i, key in enumerate(path_info):
+        if key == '{channel}':
+            channel_mask |= 1 << i
+        elif not isinstance(key, str):
+            raise ValueError(f"Invalid CONFIG_MAP key {key!r} in {path_info}")
+
+    return path_info, channel_mask, converter
+
+# Entries are compiled and checked once at import time so that
+# apply_single_update does not have to inspect the path on every update.
+# Entries with the same parent node share one prefix tuple, so that
+# _set_nested_value can tell with an identity test that two updates in a
+# row write to the same node.
+_prefixes = {}
+for _name, _path_info in CONFIG_MAP.items():
+    _path, _channel_mask, _converter = _compile_path(_path_info)
+    _prefix = _prefixes.setdefault(_path[:-1], _path[:-1])
+    CONFIG_MAP[_name] = (_path, _channel_mask, _converter, _prefix)
+# A value written over a node would leave a cached parent pointing at the old one
+for _name, (_path, _channel_mask, _converter, _prefix) in CONFIG_MAP.items():
+    if _path in _prefixes:
+        raise ValueError(f"CONFIG_MAP path {_path} of {_name} is a prefix of another path")
+del _name, _path_info, _path, _channel_mask, _converter, _prefix, _prefixes
+
+# Marks a key that is not in the config yet
+_MISSING = object()
+# Parent cache of an update batch before its first write (see apply_conf_update)
+_NO_PARENT = (None, None, None)
+
 class ConfigManager:
     """
     Manages configuration settings from static and dynamic JSON files.
@@ -177,11 +229,17 @@ class ConfigManager:
         self.static_config = self._load_config(static_config_path)
         self.dynamic_config = self._load_config(dynamic_config_path)
         self.dynamic_config_path = dynamic_config_path
+        # Set when an update changes a dynamic config value, cleared on save
+        self._dirty = False
+        # (prefix, channel, node) of the last write during apply_conf_update
+        self._parent_cache = None
 
     def _load_config(self, config_path):
         """Loads configuration from a JSON file."""
         try:
             with open(config_path, "r") as f:
+                # json.load parses straight from the stream, the file text is
+                # never held in RAM as a whole (unlike json.loads(f.read()))
                 return json.load(f)
         except (OSError, ValueError) as e: # ValueError for JSONDecodeError in MicroPython
             utils.log_error(f"Error loading configuration from {config_path}: {e}")
@@ -197,71 +255,91 @@ class ConfigManager:
 
     def _get_config_value(self, config_dict, *keys, default=None):
         """Helper function to traverse the configuration dictionary."""
+        # Missing keys and non-dict levels are caught by the subscription itself
         value = config_dict
-        for key in keys:
-            if isinstance(value, dict) and key in value:
+        try:
+            for key in keys:
                 value = value[key]
-            else:
-                return default
+        except (LookupError, TypeError):
+            return default
         return value
 
-    def _set_nested_value(self, config, path, value, channel):
+    def _set_nested_value(self, config, path, channel_mask, channel, value, prefix=None):
         """
         Navigates a nested dictionary and list structure to set a value.
         """
-        current_level = config
-        for i, key in enumerate(path):
-            # Substitute {channel} placeholder with the actual channel index
-            if key == '{channel}':
+        last = len(path) - 1
+        cached = self._parent_cache
+        if cached is not None and cached[0] is prefix and cached[1] == channel:
+            # Same parent node as the previous update of the batch
+            first = last
+            current_level = cached[2]
+        else:
+            first = 0
+            current_level = config
+        for i in range(first, last + 1):
+            key = path[i]
+            if channel_mask >> i & 1:
+                # Substitute {channel} placeholder with the actual channel index.
+                # It comes from the downlink, so it is the only key checked here
                 key = channel
-            
-            # If we are at the last key, set the value
-            if i == len(path) - 1:
-                if isinstance(current_level, dict):
-                    current_level[key] = value
-                elif isinstance(current_level, list) and isinstance(key, int) and 0 <= key < len(current_level):
-                    current_level[key] = value # This case is less common for the last element
-                else:
+                if isinstance(current_level, list):
+                    if not (isinstance(key, int) and 0 <= key < len(current_level)):
+                        utils.log_error(f"Invalid path or index: key '{key}' not found or out of bounds.")
+                        return False
+                elif not isinstance(current_level, dict):
                     utils.log_error(f"Invalid path: cannot set value at key '{key}'")
                     return False
-            else:
-                # Navigate deeper
+            elif not isinstance(current_level, dict):
+                # The other keys are strings (checked at import), which can only
+                # address a dict level
+                utils.log_error(f"Invalid path: key '{key}' does not address a dict")
+                return False
+
+            # If we are at the last key, set the value
+            if i == last:
+                if cached is not None:
+                    self._parent_cache = (prefix, channel, current_level)
                 if isinstance(current_level, dict):
-                    current_level = current_level.setdefault(key, {})
-                elif isinstance(current_level, list) and isinstance(key, int) and 0 <= key < len(current_level):
-                    current_level = current_level[key]
+                    old = current_level.get(key, _MISSING)
                 else:
-                    utils.log_error(f"Invalid path or index: key '{key}' not found or out of bounds.")
-                    return False
+                    old = current_level[key]
+                # Re-sent values are common in downlinks: leave those untouched.
+                # The type is compared too: 1 == True, but they are saved differently
+                if type(old) is not type(value) or old != value:
+                    current_level[key] = value
+                    self._dirty = True
+            elif isinstance(current_level, dict):
+                # Navigate deeper
+                current_level = current_level.setdefault(key, {})
+            else:
+                current_level = current_level[key]
         return True
 
     def apply_single_update(self, channel, config_type, value):
         """
         Applies a single configuration update using the CONFIG_MAP.
         """
-        if config_type not in CONFIG_MAP:
+        path_info = CONFIG_MAP.get(config_type)
+        if path_info is None:
             utils.log_error(f"Unknown config type: {config_type}")
             return None
 
-        path_info = CONFIG_MAP[config_type]
-        
-        # Check if there is a type converter at the end of the tuple
-        converter = None
-        if callable(path_info[-1]):
-            converter = path_info[-1]
-            path = path_info[:-1]
-        else:
-            path = path_info
+        path, channel_mask, converter, prefix = path_info
 
-        # Apply the converter to the value if it exists
-        final_value = converter(value) if converter else value
-
-        # Use a copy to avoid modifying the config directly before success
-        # Note: deepcopy is not standard in MicroPython, so we serialize/deserialize
-        config_copy = json.loads(json.dumps(self.dynamic_config))
+        # Apply the converter to the value if it exists. bool is the most
+        # common one and is inlined to save a call
+        if converter is bool:
+            final_value = True if value else False
+        elif converter:
+            final_value = converter(value)
+        else:
+            final_value = value
 
-        if self._set_nested_value(config_copy, path, final_value, channel):
-            return config_copy
+        # Set in place: _set_nested_value only fails before writing anything,
+        # so there is nothing to undo and no need for a copy of the config
+        if self._set_nested_value(self.dynamic_config, path, channel_mask, channel, final_value, prefix):
+            return self.dynamic_config
         else:
             utils.log_error(f"Failed to apply update for {config_type}")
             return None
@@ -270,33 +348,57 @@ class ConfigManager:
         """
         Applies a full configuration update from decoded LPP data.
         """
-        temp_config = self.dynamic_config
-        
-        for entry in decoded_data:
-            utils.log_info(f"Applying entry: {entry}")
-            
-            # Apply update to the temporary config object
-            updated_config = self.apply_single_update(entry['channel'], entry['name'], entry['value'])
-            
-            if updated_config is None:
-                utils.log_error(f"Failed to apply decoded data to config: {entry}")
-                # Optional: Decide if you want to stop on first error or continue
-                # return # Stop on first error
-                continue # Continue with next entry
-            
-            # Update the main dynamic config with the successful change
-            self.dynamic_config = updated_config
-            utils.log_info(f"Configuration updated successfully for {entry['name']}")
-            
-        # Save the final configuration only once after all updates are applied
+        # Downlinks come in bundles (e.g. all the settings of one Modbus input):
+        # an entry with the same parent as the previous one reuses that node
+        # instead of walking its path again. Order is kept, later entries win.
+        self._parent_cache = _NO_PARENT
+        try:
+            for entry in decoded_data:
+                utils.log_info(f"Applying entry: {entry}")
+
+                # Apply update to the dynamic config
+                updated_config = self.apply_single_update(entry['channel'], entry['name'], entry['value'])
+
+                if updated_config is None:
+                    utils.log_error(f"Failed to apply decoded data to config: {entry}")
+                    # Optional: Decide if you want to stop on first error or continue
+                    # return # Stop on first error
+                    continue # Continue with next entry
+
+                utils.log_info(f"Configuration updated successfully for {entry['name']}")
+        finally:
+            self._parent_cache = None
+
+        # Save the final configuration only once after all updates are applied,
+        # and only if they changed anything
+        if not self._dirty:
+            utils.log_info("Dynamic configuration unchanged, not saved")
+            return
+
         utils.log_info(f"Final dynamic config to be saved: {self.get_dynamic()}")
         self.save_dynamic_config_pretty()
 
+    def _replace_dynamic_config(self, tmp_path):
+        """Moves a completely written temporary file over the dynamic config file."""
+        try:
+            os.rename(tmp_path, self.dynamic_config_path)
+        except OSError:
+            # FAT cannot rename over an existing file (LittleFS can)
+            os.remove(self.dynamic_config_path)
+            os.rename(tmp_path, self.dynamic_config_path)
+        self._dirty = False
+
     def save_dynamic_config(self):
         """Saves the current dynamic configuration to its file."""
         try:
-            with open(self.dynamic_config_path, "w") as f:
-                json.dump(self.dynamic_config, f) # Use indent for readability
+            # Written to a temporary file first, so that a reset while saving
+            # cannot leave a truncated config behind
+            tmp_path = self.dynamic_config_path + ".tmp"
+            # Serialized up front: json.dump would issue one small write per token
+            data = json.dumps(self.dynamic_config)
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            self._replace_dynamic_config(tmp_path)
             utils.log_info(f"Dynamic configuration saved to {self.dynamic_config_path}")
         except OSError as e:
             utils.log_error(f"Error saving dynamic configuration to {self.dynamic_config_path}: {e}")
@@ -324,12 +426,23 @@ class ConfigManager:
             # Generate the pretty string
             pretty_json = manual_indent(self.dynamic_config)
 
-            with open(self.dynamic_config_path, "w") as f:
+            tmp_path = self.dynamic_config_path + ".tmp"
+            with open(tmp_path, "w") as f:
                 f.write(pretty_json)
+            self._replace_dynamic_config(tmp_path)
                 
             utils.log_info(f"Dynamic configuration saved (pretty) to {self.dynamic_config_path}")
         except Exception as e:
             utils.log_error(f"Error saving pretty configuration: {e}")
 
-# Create a single, global instance of the ConfigManager
-config_manager = ConfigManager()
\ No newline at end of file
+# The single, global instance of the ConfigManager. It is created on first
+# access, so the JSON files are not parsed just by importing this module
+_config_manager = None
+
+def __getattr__(name):
+    global _config_manager
+    if name == "config_manager":
+        if _config_manager is None:
+            _config_manager = ConfigManager()
+        return _config_manager
+    raise AttributeError(name)
\ No newline at end of file
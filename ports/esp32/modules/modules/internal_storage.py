@@ -10,8 +10,12 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 
 import uos
+from micropython import const
 from modules import utils
 
+# Block size for reading the payload file without loading it whole
+_CHUNK_SIZE = const(512)
+
 class InternalStorage:
     """
     Manages payloads stored in a SINGLE file on the ESP32's internal file system.
@@ -47,33 +51,89 @@ class InternalStorage:
 
     def get_file_line_count(self):
         """Counts lines in the payload file."""
+        # Newlines are counted in binary blocks, iterating the text file
+        # would build a str for every line
+        count = 0
+        last = b"\n"
         try:
-            with open(self.filename, 'r') as f:
-                return sum(1 for _ in f)
+            with open(self.filename, 'rb') as f:
+                while True:
+                    chunk = f.read(_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    count += chunk.count(b"\n")
+                    last = chunk[-1:]
         except OSError:
             return 0  # Return 0 if file doesn't exist yet
+        # A last line without its newline counts as well
+        return count if last == b"\n" else count + 1
 
     def delete_oldest_lines(self, num_lines_to_delete):
         """Deletes the specified number of oldest lines from the file."""
         if num_lines_to_delete <= 0:
             return
 
-        try:
-            with open(self.filename, "r") as f:
-                lines = f.readlines()
+        # The file is streamed through one small buffer, it can be far larger
+        # than the free heap
+        buf = bytearray(_CHUNK_SIZE)
+        buf_mv = memoryview(buf)
+        tmp_path = self.filename + ".tmp"
 
-            if len(lines) <= num_lines_to_delete:
-                # Delete entire file content
-                with open(self.filename, "w") as f:
-                    f.write("")  # Overwrite with empty string
-                utils.log_info(f"Deleted all lines from {self.filename}.")
-            else:
-                with open(self.filename, "w") as f:
-                    f.writelines(lines[num_lines_to_delete:])  # Write back newer lines
-                utils.log_info(f"Deleted {num_lines_to_delete} oldest lines from {self.filename}.")
+        try:
+            with open(self.filename, "rb") as src:
+                # First pass: find where the first line to keep starts
+                remaining = num_lines_to_delete
+                offset = 0  # File offset of buf[0]
+                cut = -1
+                while cut < 0:
+                    n = src.readinto(buf)
+                    if not n:
+                        break
+                    pos = buf.find(b"\n", 0, n)
+                    while pos >= 0:
+                        remaining -= 1
+                        if not remaining:
+                            cut = offset + pos + 1
+                            break
+                        pos = buf.find(b"\n", pos + 1, n)
+                    offset += n
+
+                n = 0
+                if cut >= 0:
+                    src.seek(cut)
+                    n = src.readinto(buf)
+
+                if not n:
+                    # Delete entire file content
+                    src.close()
+                    with open(self.filename, "w") as f:
+                        f.write("")  # Overwrite with empty string
+                    utils.log_info(f"Deleted all lines from {self.filename}.")
+                    return
+
+                # Second pass: copy the newer lines to a temporary file
+                with open(tmp_path, "wb") as dst:
+                    while n:
+                        dst.write(buf_mv[:n])
+                        n = src.readinto(buf)
+
+            try:
+                uos.rename(tmp_path, self.filename)
+            except OSError:
+                # FAT cannot rename over an existing file (LittleFS can)
+                uos.remove(self.filename)
+                uos.rename(tmp_path, self.filename)
+            utils.log_info(f"Deleted {num_lines_to_delete} oldest lines from {self.filename}.")
 
         except OSError as e:
             utils.log_error(f"Error deleting lines from {self.filename}: {e}")
+            # Do not leave a partial copy taking up the space this was meant to
+            # free, unless the payload file is already gone and it is all left
+            try:
+                uos.stat(self.filename)
+                uos.remove(tmp_path)
+            except OSError:
+                pass
 
 
     def store_payload(self, payload):
@@ -103,17 +163,23 @@ class InternalStorage:
     def manage_space(self):
         """Manages disk space, deleting oldest lines if necessary."""
 
-        while True:
-            free_space = self.get_free_space()
-            line_count = self.get_file_line_count()
+        free_space = self.get_free_space()
+        line_count = self.get_file_line_count()
 
-            utils.log_info(f"Free space: {free_space / (1024 * 1024):.2f} MB,  Line count: {line_count}, Max lines: {self.max_lines}, Threshold: {self.threshold_bytes/(1024*1024):.2f} MB")
+        utils.log_info(f"Free space: {free_space / (1024 * 1024):.2f} MB,  Line count: {line_count}, Max lines: {self.max_lines}, Threshold: {self.threshold_bytes/(1024*1024):.2f} MB")
 
-            if free_space < self.threshold_bytes or (self.max_lines is not None and line_count >= self.max_lines):
-                if not self.delete_oldest_lines(1):  # Delete at least one line
-                    break  # Exit if can not delete lines.
-            else:
-                break  # Enough space, exit the loop
+        # Work out every line to drop first and delete them in one rewrite of
+        # the file, instead of counting and rewriting it again for each line
+        num_lines_to_delete = 0
+        if self.max_lines is not None and line_count >= self.max_lines:
+            num_lines_to_delete = line_count - self.max_lines + 1
+        elif free_space < self.threshold_bytes:
+            # Low on space: drop the oldest line for the one about to be
+            # stored. The threshold may be out of reach on a small file system,
+            # so the file is not emptied to try to meet it
+            num_lines_to_delete = 1
+
+        self.delete_oldest_lines(num_lines_to_delete)
 
     def get_all_payloads(self):
         """
@@ -68,13 +68,18 @@ def log_info(message):
     """
     log_message("INFO", message)
 
-def log_debug(message):
+def log_debug(message, *args):
     """
     Logs a debug message.
 
     Args:
-        message: The debug message to log.
+        message: The debug message to log, or a %-format string for args.
+        args: Optional values for message, only formatted if DEBUG is enabled.
     """
+    if LOG_LEVEL != "DEBUG":
+        return
+    if args:
+        message = message % args
     log_message("DEBUG", message)
     
 def log_warning(message):
@@ -0,0 +1,224 @@
+# tools/assemble_ulp.py
+
+# Copyright (C) 2026 ISURKI
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+"""
+Assembles the ULP pulse counter program of modules/digital_sensor.py and
+writes the binaries to modules/_ulp_blob.py, so the device never runs the
+assembler.
+
+Run it from the repository root with the unix port of MicroPython (the
+assembler needs btree and uctypes) after changing the source below:
+
+    micropython tools/assemble_ulp.py
+"""
+
+import sys
+
+MODULES_DIR = "ports/esp32/modules"
+OUTPUT = MODULES_DIR + "/modules/_ulp_blob.py"
+
+sys.path.insert(0, MODULES_DIR)
+from lib.esp32_ulp import src_to_binary
+
+# RTC IO mux select and input enable masks of each supported GPIO
+PIN_MASKS = {
+    36: ("(BIT(27))", "(BIT(19))"),
+    39: ("(BIT(24))", "(BIT(4))"),
+}
+
+#https://github.com/espressif/esp-idf/blob/v5.0.2/components/soc/esp32/rtc_io_periph.c
+#https://github.com/espressif/esp-idf/blob/v5.0.2/components/soc/esp32/include/soc/rtc_cntl_reg.h
+#https://github.com/espressif/esp-idf/blob/v5.0.2/components/soc/esp32/include/soc/reg_base.h
+#https://github.com/espressif/esp-idf/blob/master/components/soc/esp32/register/soc/rtc_io_reg.h
+
+SOURCE = """
+            #define DR_REG_RTCIO_BASE 0x3ff48400
+            #define RTC_IO_TOUCH_PAD0_REG (DR_REG_RTCIO_BASE + 0x7c)
+            #define RTC_IO_TOUCH_PAD0_MUX_SEL_M %(mux_sel)s
+            #define RTC_IO_TOUCH_PAD0_FUN_IE_M %(fun_ie)s
+            #define RTC_GPIO_IN_REG (DR_REG_RTCIO_BASE + 0x24)
+            #define RTC_GPIO_IN_NEXT_S 14
+            #define RTC_CNTL_LOW_POWER_ST_REG         (DR_REG_RTCIO_BASE + 0xc0)
+            #define RTC_CNTL_RDY_FOR_WAKEUP  (BIT(19))
+
+            /* --- Add Magic Token --- */
+            .set token, 0xABCD
+
+            .bss
+                .global magic
+            magic:
+                .long 0
+
+                .global next_edge
+            next_edge:
+                .long 0
+
+                .global debounce_counter
+            debounce_counter:
+                .long 0
+
+                .global debounce_max_count
+            debounce_max_count:
+                .long 0
+
+                .global edge_count
+            edge_count:
+                .long 0
+
+                .global edge_count_to_wake_up
+            edge_count_to_wake_up:
+                .long 0
+
+                .global io_number
+            io_number:
+                .long 0
+
+                /* Code goes into .text section */
+                .text
+                .global entry
+            entry:
+                /* --- INICIO DE LA MODIFICACIÓN: Comprobar Magic Token --- */
+                /* Comprobar si ya hemos inicializado */
+                move r3, magic
+                ld r0, r3, 0
+                jumpr start_counting, token, eq
+
+            init:
+                /* Esto solo se ejecuta la primera vez */
+                /* connect GPIO to the RTC subsystem */
+                WRITE_RTC_REG(RTC_IO_TOUCH_PAD0_REG, RTC_IO_TOUCH_PAD0_MUX_SEL_M, 1, 1)
+                /* switch the GPIO into input mode */
+                WRITE_RTC_REG(RTC_IO_TOUCH_PAD0_REG, RTC_IO_TOUCH_PAD0_FUN_IE_M, 1, 1)
+
+                /* Guardar el token para indicar que hemos terminado la inicialización */
+                move r0, token
+                st r0, r3, 0 /* r3 todavía contiene la dirección de 'magic' */
+
+            start_counting:
+                /* El resto del programa original empieza aquí */
+                /* --- FIN DE LA MODIFICACIÓN --- */
+
+                /* Load io_number */
+                move r3, io_number
+                ld r3, r3, 0
+
+                /* Lower 16 IOs and higher need to be handled separately,
+                 * because r0-r3 registers are 16 bit wide.
+                 * Check which IO this is.
+                 */
+                move r0, r3
+                jumpr read_io_high, 16, ge
+
+                /* Read the value of lower 16 RTC IOs into R0 */
+                READ_RTC_REG(RTC_GPIO_IN_REG, RTC_GPIO_IN_NEXT_S, 16)
+                rsh r0, r0, r3
+                jump read_done
+
+                /* Read the value of RTC IOs 16-17, into R0 */
+            read_io_high:
+                READ_RTC_REG(RTC_GPIO_IN_REG, RTC_GPIO_IN_NEXT_S + 16, 2)
+                sub r3, r3, 16
+                rsh r0, r0, r3
+
+            read_done:
+                and r0, r0, 1
+                /* State of input changed? */
+                move r3, next_edge
+                ld r3, r3, 0
+                add r3, r0, r3
+                and r3, r3, 1
+                jump changed, eq
+                /* Not changed */
+                /* Reset debounce_counter to debounce_max_count */
+                move r3, debounce_max_count
+                move r2, debounce_counter
+                ld r3, r3, 0
+                st r3, r2, 0
+                /* End program */
+                halt
+
+                .global changed
+            changed:
+                /* Input state changed */
+                /* Has debounce_counter reached zero? */
+                move r3, debounce_counter
+                ld r2, r3, 0
+                add r2, r2, 0 /* dummy ADD to use "jump if ALU result is zero" */
+                jump edge_detected, eq
+                /* Not yet. Decrement debounce_counter */
+                sub r2, r2, 1
+                st r2, r3, 0
+                /* End program */
+                halt
+
+                .global edge_detected
+            edge_detected:
+                /* Reset debounce_counter to debounce_max_count */
+                move r3, debounce_max_count
+                move r2, debounce_counter
+                ld r3, r3, 0
+                st r3, r2, 0
+                /* Flip next_edge */
+                move r3, next_edge
+                ld r2, r3, 0
+                add r2, r2, 1
+                and r2, r2, 1
+                st r2, r3, 0
+                /* Increment edge_count */
+                move r3, edge_count
+                ld r2, r3, 0
+                add r2, r2, 1
+                st r2, r3, 0
+                /* Compare edge_count to edge_count_to_wake_up */
+                move r3, edge_count_to_wake_up
+                ld r3, r3, 0
+                sub r3, r3, r2
+                jump wake_up, eq
+                /* Not yet. End program */
+                halt
+
+                .global wake_up
+            wake_up:
+                /* Wake up the SoC, end program */
+                wake
+                halt
+        """
+
+HEADER = """# src/modules/_ulp_blob.py
+
+# Copyright (C) 2026 ISURKI
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+# Generated by tools/assemble_ulp.py, do not edit.
+
+# ULP pulse counter program for each supported GPIO
+"""
+
+
+def main():
+    with open(OUTPUT, "w") as f:
+        f.write(HEADER)
+        f.write("ULP_DIGITAL_BIN = {\n")
+        for gpio in sorted(PIN_MASKS):
+            mux_sel, fun_ie = PIN_MASKS[gpio]
+            binary = src_to_binary(SOURCE % {"mux_sel": mux_sel, "fun_ie": fun_ie}, cpu="esp32")
+            f.write("    %d: %r,\n" % (gpio, binary))
+        f.write("}\n")
+    print("Written", OUTPUT)
+
+
+main()